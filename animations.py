@@ -1,171 +1,610 @@
 """
 Animation effects for CTA Display
 """
+import logging
 import random
+import time
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageTk
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FRAME_WORK_TIME = REGISTRY.histogram(
+    "animation_frame_seconds", "Animation work per frame",
+    buckets=(0.001, 0.002, 0.005, 0.01, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25),
+)
+BLEND_TIME = REGISTRY.histogram("crossfade_blend_seconds", "Worker time per blended crossfade frame")
+
+
+class FrameClock:
+    """
+    One frame loop shared by every animation.
+    
+    Animations register with wake() and implement step(dt) -> bool, where
+    dt is the elapsed time in nominal frames (1.0 = one frame at the target
+    rate) and the return value says whether they still need frames. The
+    clock measures real frame intervals and work time: late frames are
+    merged into one larger step, the frame rate is lowered while frame work
+    exceeds its budget (and recovers when it fits again), and with nothing
+    animating no timer is scheduled at all.
+    """
+    
+    def __init__(self, root: tk.Tk, target_fps: float = 30, min_fps: float = 10, budget: float = 0.5):
+        """
+        Initialize frame clock.
+        
+        Args:
+            root: Tk root used for scheduling
+            target_fps: Frame rate when the Pi keeps up
+            min_fps: Lowest frame rate used under load
+            budget: Fraction of the frame interval animation work may use
+        """
+        self.root = root
+        self.target_interval = 1.0 / target_fps
+        self.max_interval = 1.0 / min_fps
+        self.budget = budget
+        
+        # Current (possibly lowered) frame interval in seconds
+        self.interval = self.target_interval
+        # Work time of the last frame in seconds, for instrumentation
+        self.last_work_s = 0.0
+        
+        self._active: List = []
+        self._after_id: Optional[str] = None
+        self._last_frame: Optional[float] = None
+    
+    @property
+    def fps(self) -> float:
+        return 1.0 / self.interval
+    
+    def is_idle(self) -> bool:
+        return self._after_id is None
+    
+    def wake(self, animation):
+        """Make sure an animation gets frames until its step() returns False."""
+        if animation not in self._active:
+            self._active.append(animation)
+        if self._after_id is None:
+            self._last_frame = time.perf_counter() - self.interval
+            self._after_id = self.root.after(0, self._frame)
+    
+    def _frame(self):
+        start = time.perf_counter()
+        # Elapsed time in nominal frames; a stall merges into one step, capped
+        # so nothing teleports after a long freeze
+        dt = min((start - self._last_frame) / self.target_interval, 4.0)
+        self._last_frame = start
+        
+        for animation in list(self._active):
+            try:
+                still_active = animation.step(dt)
+            except Exception:
+                logger.exception("Error in animation step")
+                still_active = False
+            if not still_active:
+                self._active.remove(animation)
+        
+        work = time.perf_counter() - start
+        self.last_work_s = work
+        FRAME_WORK_TIME.observe(work)
+        
+        # Lower the frame rate while over budget; creep back when there is headroom
+        if work > self.interval * self.budget:
+            self.interval = min(self.interval * 1.25, self.max_interval)
+        elif work < self.interval * self.budget / 2:
+            self.interval = max(self.interval * 0.95, self.target_interval)
+        
+        if not self._active:
+            # Fully idle: no timer until the next wake()
+            self._after_id = None
+            return
+        
+        delay_ms = max(1, int((self.interval - work) * 1000))
+        self._after_id = self.root.after(delay_ms, self._frame)
 
 
 class BubbleAnimation:
-    """Manages bubble animations on touch/click events."""
+    """
+    Manages bubble animations on touch/click events.
     
-    def __init__(self, canvas: tk.Canvas, root: tk.Tk):
+    Bubbles live in a fixed-capacity pool: canvas ovals are created once and
+    shown/hidden instead of created/deleted, positions and velocities are
+    NumPy arrays advanced in one step, and touch events are coalesced to at
+    most one spawn per frame. Frame cost is bounded by the pool size no
+    matter how fast someone scribbles.
+    """
+    
+    COLORS = ["#4A90E2", "#50C878", "#FFD700", "#FF6B9D", "#9B59B6"]
+    
+    def __init__(self, canvas: tk.Canvas, clock: FrameClock, capacity: int = 60):
         self.canvas = canvas
-        self.root = root
-        self.bubbles = []
-        self.is_running = False
+        self.clock = clock
+        self.capacity = capacity
+        
+        # Canvas item pool, hidden until a slot is used
+        self.item_ids = [
+            canvas.create_oval(0, 0, 0, 0, fill=self.COLORS[0], outline="", width=0, state="hidden")
+            for _ in range(capacity)
+        ]
+        
+        # Particle state, one slot per pooled item
+        self.x = np.zeros(capacity, dtype="float32")
+        self.y = np.zeros(capacity, dtype="float32")
+        self.vx = np.zeros(capacity, dtype="float32")
+        self.vy = np.zeros(capacity, dtype="float32")
+        self.radius = np.zeros(capacity, dtype="float32")
+        self.age = np.zeros(capacity, dtype="float32")
+        self.max_age = np.zeros(capacity, dtype="float32")
+        self.alive = np.zeros(capacity, dtype=bool)
+        
+        # Slots are handed out round-robin, so a full pool recycles the oldest bubbles
+        self._cursor = 0
+        # Latest touch point since the last frame (older ones in the same frame are dropped)
+        self._pending_touch: Optional[Tuple[int, int]] = None
     
     def spawn_bubbles(self, x: int, y: int):
-        """Spawn 3-5 bubbles around the touch point."""
+        """Spawn 3-5 bubbles around the touch point (on the next frame)."""
+        self._pending_touch = (x, y)
+        self.clock.wake(self)
+    
+    def _spawn(self, x: int, y: int):
+        """Fill 3-5 pool slots with fresh bubbles around a point."""
         count = random.randint(3, 5)
-        for _ in range(count):
-            # Random offset from touch point
-            offset_x = random.randint(-20, 20)
-            offset_y = random.randint(-20, 20)
-            bubble_x = x + offset_x
-            bubble_y = y + offset_y
-            
-            # Bubble properties
-            radius = random.randint(8, 16)
-            color = random.choice(["#4A90E2", "#50C878", "#FFD700", "#FF6B9D", "#9B59B6"])
-            
-            # Create oval on canvas
-            bubble_id = self.canvas.create_oval(
-                bubble_x - radius, bubble_y - radius,
-                bubble_x + radius, bubble_y + radius,
-                fill=color, outline="", width=0
-            )
-            
-            # Movement properties
-            vx = random.uniform(-1.5, 1.5)  # Horizontal drift
-            vy = random.uniform(-3, -5)     # Upward velocity
-            max_age = random.randint(60, 90)  # Lifespan in frames (~2-3 seconds at 30fps)
-            
-            self.bubbles.append({
-                "id": bubble_id,
-                "x": bubble_x,
-                "y": bubble_y,
-                "vx": vx,
-                "vy": vy,
-                "age": 0,
-                "max_age": max_age,
-            })
-        
-        # Start animation if not already running
-        if not self.is_running:
-            self.is_running = True
-            self._animate()
-    
-    def _animate(self):
-        """Update all bubbles: move, age, and remove expired ones."""
-        to_remove = []
-        
-        for bubble in self.bubbles:
-            bubble["age"] += 1
-            
-            # Remove if expired
-            if bubble["age"] >= bubble["max_age"]:
-                self.canvas.delete(bubble["id"])
-                to_remove.append(bubble)
-                continue
-            
-            # Update position
-            bubble["x"] += bubble["vx"]
-            bubble["y"] += bubble["vy"]
-            
-            # Move on canvas
+        slots = [(self._cursor + i) % self.capacity for i in range(count)]
+        self._cursor = (self._cursor + count) % self.capacity
+        
+        # Random offset from touch point
+        self.x[slots] = x + np.random.randint(-20, 21, count)
+        self.y[slots] = y + np.random.randint(-20, 21, count)
+        
+        # Bubble properties
+        self.radius[slots] = np.random.randint(8, 17, count)
+        
+        # Movement properties
+        self.vx[slots] = np.random.uniform(-1.5, 1.5, count)  # Horizontal drift
+        self.vy[slots] = np.random.uniform(-5, -3, count)     # Upward velocity
+        self.max_age[slots] = np.random.randint(60, 91, count)  # Lifespan in frames (~2-3 seconds at 30fps)
+        self.age[slots] = 0
+        self.alive[slots] = True
+        
+        for slot in slots:
+            self.canvas.itemconfigure(self.item_ids[slot], fill=random.choice(self.COLORS), state="normal")
+    
+    def step(self, dt: float) -> bool:
+        """
+        Advance all bubbles by dt frames: move, age, and hide expired ones.
+        
+        Returns:
+            True while any bubble is still alive
+        """
+        if self._pending_touch is not None:
+            self._spawn(*self._pending_touch)
+            self._pending_touch = None
+        
+        self.age[self.alive] += dt
+        
+        # Hide expired bubbles; their slots are free for reuse
+        expired = self.alive & (self.age >= self.max_age)
+        for slot in np.flatnonzero(expired):
+            self.canvas.itemconfigure(self.item_ids[slot], state="hidden")
+        self.alive &= ~expired
+        
+        # Update positions (dead slots move too; they are hidden and cheaper not to mask)
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        
+        # Move on canvas
+        for slot in np.flatnonzero(self.alive):
+            r = self.radius[slot]
             self.canvas.coords(
-                bubble["id"],
-                bubble["x"] - 12, bubble["y"] - 12,
-                bubble["x"] + 12, bubble["y"] + 12
+                self.item_ids[slot],
+                self.x[slot] - r, self.y[slot] - r,
+                self.x[slot] + r, self.y[slot] + r,
             )
         
-        # Remove expired bubbles from list
-        for bubble in to_remove:
-            self.bubbles.remove(bubble)
-        
         # Continue animation if bubbles remain
-        if self.bubbles:
-            self.root.after(33, self._animate)  # ~30fps
-        else:
-            self.is_running = False
+        return bool(self.alive.any())
+
+
+def ring_profile(glow_px: float, subpixels: int = 4) -> np.ndarray:
+    """
+    Soft-glow ring cross-section as a lookup table.
+    
+    Args:
+        glow_px: Gaussian width of the glow in pixels
+        subpixels: Table entries per pixel of distance from the ring
+    
+    Returns:
+        float32 alpha by |distance - radius| * subpixels; the last entry is 0
+    """
+    reach = int(np.ceil(3 * glow_px * subpixels))
+    offsets = np.arange(reach + 1, dtype="float32") / subpixels
+    profile = np.exp(-((offsets / glow_px) ** 2)).astype("float32")
+    profile[-1] = 0.0
+    return profile
+
+
+def render_ripple_frames(
+    background: Image.Image,
+    frames: int = 20,
+    rings: int = 3,
+    ring_gap: float = 60,
+    glow_px: float = 5,
+    strength: float = 0.85,
+) -> List[Image.Image]:
+    """
+    Pre-render a ripple transition over a background.
+    
+    Rings of soft white glow spread from the center and are alpha-blended
+    into the photo with NumPy, so each frame is a complete screen image and
+    playback needs no drawing at all. The last frame has every ring past
+    the corners, i.e. it is the plain background.
+    
+    Args:
+        background: Screen-sized background the ripple plays over
+        frames: Number of frames in the transition
+        rings: Concentric rings, ring_gap pixels apart
+        ring_gap: Spacing between rings in pixels
+        glow_px: Softness of each ring
+        strength: Peak opacity of a ring at the center (fades toward the edges)
+    
+    Returns:
+        List of RGB images the size of background
+    """
+    w, h = background.size
+    bg = np.asarray(background.convert("RGB"), dtype="float32")
+    
+    subpixels = 4
+    profile = ring_profile(glow_px, subpixels)
+    reach = len(profile) - 1
+    
+    # Distance from the center in table units, computed once per transition
+    yy, xx = np.ogrid[:h, :w]
+    dist = (np.hypot(xx - w / 2, yy - h / 2) * subpixels).astype("int32")
+    max_radius = float(dist.max()) / subpixels + 3 * glow_px
+    travel = max_radius + ring_gap * (rings - 1)
+    
+    alpha = np.empty((h, w), dtype="float32")
+    offset = np.empty((h, w), dtype="int32")
+    out = []
+    for i in range(frames):
+        lead = travel * (i + 1) / frames
+        alpha.fill(0.0)
+        for k in range(rings):
+            radius = lead - k * ring_gap
+            if radius <= 0 or radius > max_radius:
+                continue
+            np.subtract(dist, int(radius * subpixels), out=offset)
+            np.abs(offset, out=offset)
+            np.minimum(offset, reach, out=offset)
+            # Rings dim as they spread toward the corners
+            fade = strength * (1.0 - 0.6 * radius / max_radius)
+            np.maximum(alpha, profile[offset] * fade, out=alpha)
+        
+        # Blend toward white: out = bg + (255 - bg) * alpha
+        blended = bg + (255.0 - bg) * alpha[..., None]
+        out.append(Image.fromarray(blended.astype("uint8"), "RGB"))
+    return out
 
 
 class RippleAnimation:
-    """Manages ripple transition effects."""
+    """
+    Ripple transition played back from pre-rendered frames.
     
-    def __init__(self, canvas: tk.Canvas, root: tk.Tk, screen_w: int, screen_h: int, background_id: int, title_id: int):
+    Frames for a background are rendered on a worker thread as soon as that
+    background is decoded (ideally while it is still the upcoming slide) and
+    kept in a small LRU keyed by screen size and background key. Playback
+    shows them through one canvas image item just above the background, so
+    each frame is a single itemconfigure; the Tk image for the next frame is
+    converted right after each swap.
+    """
+    
+    def __init__(
+        self,
+        canvas: tk.Canvas,
+        clock: FrameClock,
+        screen_w: int,
+        screen_h: int,
+        frames: int = 20,
+        fps: float = 12,
+        cached_transitions: int = 2,
+        max_wait_s: float = 1.0,
+        photo_factory: Callable[[Image.Image], Any] = ImageTk.PhotoImage,
+    ):
+        """
+        Initialize ripple animation.
+        
+        Args:
+            canvas: Canvas to draw on
+            clock: Shared frame clock
+            screen_w: Screen width in pixels
+            screen_h: Screen height in pixels
+            frames: Frames per transition (each costs one screen-sized RGB image)
+            fps: Playback rate of the pre-rendered frames
+            cached_transitions: Frame sets kept (current and upcoming background)
+            max_wait_s: Skip the effect if its frames are not ready this long after start()
+            photo_factory: Converts a frame for the canvas (Tk thread only)
+        """
         self.canvas = canvas
-        self.root = root
+        self.clock = clock
         self.screen_w = screen_w
         self.screen_h = screen_h
-        self.background_id = background_id
-        self.title_id = title_id
-        self.ripples = []
-        self.is_running = False
-    
-    def start(self):
-        """Start ripple effect from center of screen."""
-        center_x = self.screen_w // 2
-        center_y = self.screen_h // 2
-        
-        # Calculate max radius to cover entire screen from center
-        max_radius = int((self.screen_w**2 + self.screen_h**2)**0.5 / 2) + 50
-        
-        # Create 3 ripples with staggered starts
-        for i in range(3):
-            ripple_id = self.canvas.create_oval(
-                center_x, center_y,
-                center_x, center_y,
-                outline="white",
-                width=3,
-                fill=""
-            )
-            # Layer ripples above background but below text
-            self.canvas.tag_raise(ripple_id, self.background_id)
-            self.canvas.tag_lower(ripple_id, self.title_id)
-            
-            self.ripples.append({
-                "id": ripple_id,
-                "center_x": center_x,
-                "center_y": center_y,
-                "radius": -i * 30,  # Stagger start times
-                "max_radius": max_radius,
-                "speed": 5,  # Pixels per frame
-            })
-        
-        # Start animation if not already running
-        if not self.is_running:
-            self.is_running = True
-            self._animate()
-    
-    def _animate(self):
-        """Update ripple expansion animation."""
-        to_remove = []
-        
-        for ripple in self.ripples:
-            ripple["radius"] += ripple["speed"]
-            
-            # Remove if fully expanded
-            if ripple["radius"] > ripple["max_radius"]:
-                self.canvas.delete(ripple["id"])
-                to_remove.append(ripple)
-                continue
+        self.frames = frames
+        self.fps = fps
+        self.cached_transitions = cached_transitions
+        self.max_wait_s = max_wait_s
+        self.photo_factory = photo_factory
+        
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ripple-render")
+        self._transitions: "OrderedDict[Hashable, Future]" = OrderedDict()
+        
+        # Playback state
+        self._playing: Optional[Future] = None
+        self._above_id: Optional[int] = None
+        self._item_id: Optional[int] = None
+        self._photos: Dict[int, Any] = {}
+        self._shown_index = -1
+        self._position = 0.0
+        self._waited = 0.0
+    
+    def _cache_key(self, key: Hashable) -> Hashable:
+        return (self.screen_w, self.screen_h, key)
+    
+    def prepare(self, key: Hashable, background: Image.Image):
+        """
+        Render a background's transition on the worker (no-op if cached).
+        
+        Args:
+            key: Background cache key (e.g. BackgroundManager.background_key)
+            background: Screen-sized background image
+        """
+        cache_key = self._cache_key(key)
+        if cache_key in self._transitions:
+            self._transitions.move_to_end(cache_key)
+            return
+        
+        self._transitions[cache_key] = self._executor.submit(render_ripple_frames, background, self.frames)
+        while len(self._transitions) > self.cached_transitions:
+            self._transitions.popitem(last=False)
+    
+    def start(self, key: Hashable, background_id: int):
+        """
+        Play the transition for a background that was just swapped in.
+        
+        Args:
+            key: Background cache key passed to prepare()
+            background_id: Canvas item the frames are layered directly above
+        """
+        transition = self._transitions.get(self._cache_key(key))
+        if transition is None:
+            # Never prepared (e.g. render failed): skip the effect
+            return
+        
+        self._finish()
+        self._playing = transition
+        self._above_id = background_id
+        self._position = 0.0
+        self._waited = 0.0
+        self.clock.wake(self)
+    
+    def step(self, dt: float) -> bool:
+        """
+        Show the frame due after dt more clock frames.
+        
+        Returns:
+            True until the last frame has been shown
+        """
+        if self._playing is None:
+            return False
+        
+        if not self._playing.done():
+            # Still rendering; a ripple arriving long after the swap looks
+            # like a glitch, so give up after max_wait_s
+            self._waited += dt * self.clock.target_interval
+            if self._waited > self.max_wait_s:
+                self._finish()
+                return False
+            return True
+        
+        try:
+            frames = self._playing.result()
+        except Exception:
+            logger.exception("Error rendering ripple frames")
+            self._finish()
+            return False
+        
+        index = int(self._position)
+        if index >= len(frames):
+            self._finish()
+            return False
+        
+        # Playback runs slower than the clock; repeated ticks on a frame are free
+        if index != self._shown_index:
+            photo = self._photo(frames, index)
+            if self._item_id is None:
+                self._item_id = self.canvas.create_image(0, 0, anchor="nw", image=photo)
+                # Above the background, below every text item
+                self.canvas.tag_raise(self._item_id, self._above_id)
+            else:
+                self.canvas.itemconfigure(self._item_id, image=photo)
+            self._shown_index = index
             
-            # Only draw if radius is positive
-            if ripple["radius"] > 0:
-                # Update oval coordinates
-                x1 = ripple["center_x"] - ripple["radius"]
-                y1 = ripple["center_y"] - ripple["radius"]
-                x2 = ripple["center_x"] + ripple["radius"]
-                y2 = ripple["center_y"] + ripple["radius"]
-                self.canvas.coords(ripple["id"], x1, y1, x2, y2)
-        
-        # Remove finished ripples
-        for ripple in to_remove:
-            self.ripples.remove(ripple)
-        
-        # Continue animation if ripples remain
-        if self.ripples:
-            self.root.after(33, self._animate)  # ~30fps
-        else:
-            self.is_running = False
\ No newline at end of file
+            # Convert the next frame now, so the next step is only the swap
+            if index + 1 < len(frames):
+                self._photo(frames, index + 1)
+        
+        self._position += dt * self.clock.target_interval * self.fps
+        return True
+    
+    def _photo(self, frames: List[Image.Image], index: int):
+        photo = self._photos.get(index)
+        if photo is None:
+            photo = self._photos[index] = self.photo_factory(frames[index])
+            # Frames are shown in order; release the ones behind us
+            self._photos = {i: p for i, p in self._photos.items() if i >= index - 1}
+        return photo
+    
+    def _finish(self):
+        """Drop the overlay (the last frame matches the background under it)."""
+        if self._item_id is not None:
+            self.canvas.delete(self._item_id)
+        self._item_id = None
+        self._playing = None
+        self._photos = {}
+        self._shown_index = -1
+
+
+class CrossfadeAnimation:
+    """
+    Crossfade from the outgoing background to the new one.
+    
+    The outgoing background's PhotoImage stays on screen in an overlay item
+    above the (already swapped) new background, and blended frames are
+    pasted into it until the overlay is removed. Blending runs on a worker
+    with integer NumPy math into buffers allocated once per screen size;
+    frames alternate between two reusable PIL images, so the worker fills
+    one while the Tk thread pastes the other. Playback is timed, not
+    counted: the worker renders the frame due next, at most max_fps, so a
+    slow Pi shows fewer frames instead of a longer fade.
+    """
+    
+    # Blend weights are 0..WEIGHT_ONE, small enough that (new - old) * w fits int16
+    WEIGHT_SHIFT = 7
+    WEIGHT_ONE = 1 << WEIGHT_SHIFT
+    
+    def __init__(self, canvas: tk.Canvas, clock: FrameClock, duration_s: float = 0.6, max_fps: float = 15):
+        """
+        Initialize crossfade animation.
+        
+        Args:
+            canvas: Canvas to draw on
+            clock: Shared frame clock
+            duration_s: Length of the fade
+            max_fps: Upper bound on blended frames per second
+        """
+        self.canvas = canvas
+        self.clock = clock
+        self.duration_s = duration_s
+        self.max_fps = max_fps
+        
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crossfade")
+        
+        # Blend buffers, reused across transitions of the same size
+        self._size: Optional[Tuple[int, int]] = None
+        self._old: Optional[np.ndarray] = None
+        self._diff: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+        self._out: Optional[np.ndarray] = None
+        self._images: List[Image.Image] = []
+        
+        # Playback state
+        self._photo = None
+        self._item_id: Optional[int] = None
+        self._job: Optional[Future] = None
+        self._next_image = 0
+        self._elapsed = 0.0
+        self._last_submit = 0.0
+    
+    def start(self, old_image: Image.Image, old_photo, new_image: Image.Image, background_id: int):
+        """
+        Fade out the previous background over the one just swapped in.
+        
+        Args:
+            old_image: Outgoing background (screen-sized RGB)
+            old_photo: PhotoImage that showed it; frames are pasted into it
+            new_image: Incoming background, same size
+            background_id: Canvas item the overlay is layered directly above
+        """
+        if old_image.size != new_image.size:
+            return
+        
+        self._finish()
+        self._photo = old_photo
+        self._item_id = self.canvas.create_image(0, 0, anchor="nw", image=old_photo)
+        # Above the background, below every text item
+        self.canvas.tag_raise(self._item_id, background_id)
+        
+        self._elapsed = 0.0
+        self._last_submit = -1.0
+        self._job = self._executor.submit(self._load, old_image, new_image)
+        self.clock.wake(self)
+    
+    def step(self, dt: float) -> bool:
+        """
+        Paste the latest finished blend and queue the next one.
+        
+        Returns:
+            True until the fade is complete
+        """
+        if self._item_id is None:
+            return False
+        
+        self._elapsed += dt * self.clock.target_interval
+        if self._elapsed >= self.duration_s:
+            self._finish()
+            return False
+        
+        if self._job is not None:
+            if not self._job.done():
+                return True
+            try:
+                image = self._job.result()
+            except Exception:
+                logger.exception("Error blending crossfade")
+                self._finish()
+                return False
+            self._job = None
+            if image is not None:
+                self._photo.paste(image)
+        
+        # Frame spacing is checked to the nearest clock tick
+        if self._elapsed - self._last_submit >= 1.0 / self.max_fps - self.clock.target_interval / 2:
+            # Render the frame that will be due once the worker is done
+            t = min((self._elapsed + 1.0 / self.max_fps) / self.duration_s, 1.0)
+            self._job = self._executor.submit(self._blend, round(t * self.WEIGHT_ONE), self._next_image)
+            self._next_image ^= 1
+            self._last_submit = self._elapsed
+        return True
+    
+    def _load(self, old_image: Image.Image, new_image: Image.Image) -> None:
+        """Fill the per-transition buffers (worker thread)."""
+        w, h = old_image.size
+        if self._size != (w, h):
+            self._size = (w, h)
+            self._old = np.empty((h, w, 3), dtype="int16")
+            self._diff = np.empty((h, w, 3), dtype="int16")
+            self._scratch = np.empty((h, w, 3), dtype="int16")
+            self._out = np.empty((h, w, 3), dtype="uint8")
+            self._images = [Image.new("RGB", (w, h)) for _ in range(2)]
+        
+        np.copyto(self._old, np.asarray(old_image.convert("RGB")))
+        np.subtract(np.asarray(new_image.convert("RGB")), self._old, out=self._diff, dtype="int16")
+    
+    def _blend(self, weight: int, index: int) -> Image.Image:
+        """old + (new - old) * weight / WEIGHT_ONE into a reused image (worker thread)."""
+        with BLEND_TIME.time():
+            np.multiply(self._diff, weight, out=self._scratch)
+            np.right_shift(self._scratch, self.WEIGHT_SHIFT, out=self._scratch)
+            np.add(self._scratch, self._old, out=self._scratch)
+            np.copyto(self._out, self._scratch, casting="unsafe")
+            image = self._images[index]
+            image.frombytes(self._out)
+        return image
+    
+    def _finish(self):
+        """Drop the overlay, revealing the new background underneath."""
+        if self._job is not None and not self._job.cancel():
+            # A blend is running; let it finish before its buffers are reused
+            wait([self._job])
+        self._job = None
+        if self._item_id is not None:
+            self.canvas.delete(self._item_id)
+        self._item_id = None
+        self._photo = None
@@ -0,0 +1,146 @@
+"""
+Cached arrivals model with a local countdown between API polls
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import cta_time
+
+
+def minutes_until(arrival: datetime, now: datetime) -> int:
+    """Whole minutes from now until arrival (negative once the train is due)."""
+    return int((arrival - now).total_seconds() // 60)
+
+
+def trains_to_json(trains: Optional[List[Dict]]) -> Optional[List[Dict]]:
+    """JSON-safe copy of train dicts (arrival as an ISO 8601 string with offset)."""
+    if trains is None:
+        return None
+    return [{**t, "arrival": t["arrival"].isoformat()} for t in trains]
+
+
+def trains_from_json(data: Optional[List[Dict]]) -> Optional[List[Dict]]:
+    """Inverse of trains_to_json; entries with unreadable arrivals are dropped."""
+    if data is None:
+        return None
+    trains = []
+    for t in data:
+        try:
+            trains.append({**t, "arrival": cta_time.parse_cta_time(t["arrival"])})
+        except (KeyError, TypeError, ValueError):
+            continue
+    return trains
+
+
+class ArrivalsView(NamedTuple):
+    """What the display should draw right now."""
+    trains: Optional[List[Dict]]
+    age_s: Optional[float]
+    is_stale: bool
+
+
+class ArrivalsCache:
+    """
+    Keeps absolute arrival times from the last successful poll.
+    
+    Minutes are recomputed on every view() call, so the countdown keeps
+    moving between polls. A failed poll leaves the previous data in place
+    (stale-while-revalidate) until it is older than the TTL. When polls are
+    spaced out (e.g. overnight), both limits stretch to the scheduled gap so
+    data is only flagged once a poll has actually been missed.
+    """
+    
+    def __init__(self, ttl_s: float = 180, stale_after_s: float = 60):
+        """
+        Initialize arrivals cache.
+        
+        Args:
+            ttl_s: Seconds after which cached arrivals are dropped entirely
+            stale_after_s: Seconds after which cached arrivals are flagged stale
+        """
+        self.ttl_s = ttl_s
+        self.stale_after_s = stale_after_s
+        
+        self.has_polled = False
+        self._trains: Optional[List[Dict]] = None
+        self._fetched_at: Optional[float] = None
+        self._next_poll_s: Optional[float] = None
+    
+    def update(self, trains: Optional[List[Dict]], next_poll_s: Optional[float] = None, age_s: float = 0):
+        """
+        Store the result of a poll.
+        
+        Args:
+            trains: Train dicts with an "arrival" datetime, or None if the poll failed
+            next_poll_s: Seconds until the next scheduled poll, if known
+            age_s: Seconds since the poll was made (e.g. a replayed broker event)
+        """
+        self.has_polled = True
+        if trains is None:
+            # Keep serving what we have; view() expires it by TTL
+            return
+        
+        self._trains = [t for t in trains if t.get("arrival") is not None]
+        self._fetched_at = time.monotonic() - max(0.0, age_s)
+        self._next_poll_s = next_poll_s
+    
+    def restore(self, trains: List[Dict], age_s: float):
+        """
+        Seed the cache from a persisted poll (e.g. snapshot.load_arrivals at startup).
+        
+        Counts as a poll for has_polled, so the countdown is drawn right away;
+        the age carries over, so old data shows as stale or expires as usual.
+        
+        Args:
+            trains: Train dicts with an "arrival" datetime
+            age_s: Seconds since that poll
+        """
+        self.has_polled = True
+        self._trains = [t for t in trains if t.get("arrival") is not None]
+        self._fetched_at = time.monotonic() - age_s
+    
+    def limits(self) -> Tuple[float, float]:
+        """
+        Current (stale_after_s, ttl_s) for the cached data.
+        
+        Data is stale once two scheduled polls have been missed, and expires
+        the same margin after that as with the configured limits.
+        """
+        if self._next_poll_s is None:
+            return self.stale_after_s, self.ttl_s
+        stale_after_s = max(self.stale_after_s, 2 * self._next_poll_s)
+        return stale_after_s, max(self.ttl_s, stale_after_s + self.ttl_s - self.stale_after_s)
+    
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful poll, or None if there never was one."""
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+    
+    def view(self, now: Optional[datetime] = None) -> ArrivalsView:
+        """
+        Recompute countdowns against the current time.
+        
+        Args:
+            now: Current time (defaults to cta_time.now())
+        
+        Returns:
+            ArrivalsView; trains is None if there is no data or it has expired
+        """
+        age_s = self.age()
+        stale_after_s, ttl_s = self.limits()
+        if self._trains is None or age_s is None or age_s > ttl_s:
+            return ArrivalsView(None, age_s, False)
+        
+        if now is None:
+            now = cta_time.now()
+        
+        trains = []
+        for train in self._trains:
+            minutes = minutes_until(train["arrival"], now)
+            if minutes < 0:
+                continue
+            trains.append({**train, "minutes": minutes})
+        
+        return ArrivalsView(trains, age_s, age_s > stale_after_s)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Shared arrivals broker: one upstream fetch per stop, fanned out to every display
+
+Displays subscribe over Server-Sent Events (GET /arrivals/stream?stop_id=...)
+and receive each poll's trains as one JSON event. The broker polls only the
+stops that currently have subscribers, batching stops by station, on the
+same adaptive PollScheduler a standalone display uses, so Train Tracker
+traffic does not grow with the number of screens.
+
+Usage:
+    python3 arrivals_broker.py [--host 0.0.0.0] [--port 5003] [--log broker.log]
+    BROKER_URL=http://broker-pi:5003 python3 cta-display.py
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from flask import Flask, Response, abort, jsonify, request
+
+import log_utils
+import metrics
+from arrivals import trains_to_json
+from cta_api import DEFAULT_BASE_URL, CTAClient, StopQuery
+from poll_scheduler import PollScheduler
+
+logger = logging.getLogger(__name__)
+
+# Seconds between keep-alive comments on idle streams (lets both ends spot dead peers)
+KEEPALIVE_S = 15
+# Events buffered per subscriber; a slow display drops its oldest events
+SUBSCRIBER_QUEUE = 8
+MAX_RESULTS_LIMIT = 10
+
+SUBSCRIBERS = metrics.REGISTRY.gauge("broker_subscribers", "Connected display streams")
+STOPS = metrics.REGISTRY.gauge("broker_stops", "Stop queries currently being polled")
+
+
+class ArrivalsHub:
+    """Subscriber queues and the latest event per stop query (thread-safe)."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[StopQuery, List[queue.Queue]] = {}
+        self._latest: Dict[StopQuery, str] = {}
+        # Set when a stop without cached data gains a subscriber
+        self.new_stop = threading.Event()
+    
+    def subscribe(self, query: StopQuery) -> queue.Queue:
+        """Register a subscriber; it immediately gets the cached event, if any."""
+        q: queue.Queue = queue.Queue(SUBSCRIBER_QUEUE)
+        with self._lock:
+            self._subscribers.setdefault(query, []).append(q)
+            latest = self._latest.get(query)
+            self._update_gauges()
+        if latest is None:
+            self.new_stop.set()
+        else:
+            q.put(latest)
+        return q
+    
+    def unsubscribe(self, query: StopQuery, q: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(query, [])
+            if q in subscribers:
+                subscribers.remove(q)
+            if not subscribers:
+                # Nobody is watching: stop polling it and forget its data
+                self._subscribers.pop(query, None)
+                self._latest.pop(query, None)
+            self._update_gauges()
+    
+    def queries(self) -> List[StopQuery]:
+        with self._lock:
+            return list(self._subscribers)
+    
+    def latest(self, query: StopQuery) -> Optional[str]:
+        with self._lock:
+            return self._latest.get(query)
+    
+    def publish(self, query: StopQuery, event: str):
+        """Cache an event and hand it to every subscriber of the query."""
+        with self._lock:
+            if query not in self._subscribers:
+                return
+            self._latest[query] = event
+            subscribers = list(self._subscribers[query])
+        for q in subscribers:
+            while True:
+                try:
+                    q.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+    
+    def _update_gauges(self):
+        SUBSCRIBERS.set(sum(len(s) for s in self._subscribers.values()))
+        STOPS.set(len(self._subscribers))
+
+
+class BrokerPoller:
+    """Polls every subscribed stop on one thread and publishes the results."""
+    
+    def __init__(self, hub: ArrivalsHub, client: CTAClient, scheduler: PollScheduler):
+        """
+        Initialize broker poller.
+        
+        Args:
+            hub: Where results are published
+            client: Train Tracker client (batches stops sharing a station)
+            scheduler: Picks the delay between polls
+        """
+        self.hub = hub
+        self.client = client
+        self.scheduler = scheduler
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="broker-poll", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self.hub.new_stop.set()
+    
+    def poll_once(self) -> float:
+        """
+        Fetch all subscribed stops once and publish them.
+        
+        Returns:
+            Seconds until the next poll
+        """
+        queries = self.hub.queries()
+        if not queries:
+            return self.scheduler.idle_s
+        
+        try:
+            results = self.client.get_arrivals(queries)
+        except Exception:
+            logger.exception("Unexpected error polling arrivals")
+            results = {query: None for query in queries}
+        
+        # One HTTP request per station (map_id) or ungrouped stop
+        requests = len({q.map_id or q.stop_id for q in queries})
+        succeeded = [trains for trains in results.values() if trains is not None]
+        merged = [t for trains in succeeded for t in trains] if succeeded else None
+        delay = self.scheduler.next_delay(merged, requests=requests)
+        
+        for query, trains in results.items():
+            event = json.dumps({
+                "trains": trains_to_json(trains),
+                "next_poll_s": round(delay, 1),
+                "fetched_at": time.time(),
+            })
+            self.hub.publish(query, event)
+        return delay
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self.hub.new_stop.clear()
+            delay = self.poll_once()
+            # A display subscribing to an uncached stop cuts the wait short
+            self.hub.new_stop.wait(delay)
+
+
+def query_from_args(args) -> StopQuery:
+    """StopQuery from request arguments (stop_id required)."""
+    stop_id = args.get("stop_id")
+    if not stop_id:
+        abort(400, "stop_id is required")
+    try:
+        max_results = min(int(args.get("max_results", 2)), MAX_RESULTS_LIMIT)
+    except ValueError:
+        abort(400, "max_results must be an integer")
+    return StopQuery(
+        stop_id=stop_id,
+        route=args.get("route", "Brn"),
+        destination=args.get("destination", "loop"),
+        map_id=args.get("map_id") or None,
+        max_results=max_results,
+    )
+
+
+# === APP ===
+
+app = Flask(__name__)
+hub = ArrivalsHub()
+
+
+@app.route("/arrivals/stream", methods=["GET"])
+def arrivals_stream():
+    """SSE stream of arrivals for one stop query."""
+    query = query_from_args(request.args)
+    q = hub.subscribe(query)
+    
+    def events():
+        try:
+            while True:
+                try:
+                    event = q.get(timeout=KEEPALIVE_S)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {event}\n\n"
+        finally:
+            hub.unsubscribe(query, q)
+    
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/arrivals", methods=["GET"])
+def arrivals_snapshot():
+    """Latest cached event for a stop query (404 until it has been polled)."""
+    event = hub.latest(query_from_args(request.args))
+    if event is None:
+        abort(404)
+    return Response(event, mimetype="application/json")
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({"status": "ok", "stops": len(hub.queries())}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render("cta_broker_"), mimetype="text/plain; version=0.0.4")
+
+
+def main():
+    load_dotenv()
+    
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="0.0.0.0", help="listen address (displays connect over the LAN)")
+    ap.add_argument("--port", type=int, default=int(os.environ.get("BROKER_PORT", "5003")))
+    ap.add_argument("--log", help="rotating log file (default: stderr only)")
+    args = ap.parse_args()
+    log_utils.setup_logging(args.log, console=True)
+    
+    api_key = os.environ.get("CTA_KEY")
+    if not api_key:
+        raise RuntimeError("CTA_KEY must be set in the environment (.env)")
+    
+    client = CTAClient(api_key, base_url=os.environ.get("CTA_BASE_URL", DEFAULT_BASE_URL))
+    scheduler = PollScheduler(daily_budget=int(os.environ.get("CTA_DAILY_BUDGET", "100000")))
+    poller = BrokerPoller(hub, client, scheduler)
+    poller.start()
+    try:
+        # threaded: each open stream holds a thread
+        app.run(host=args.host, port=args.port, threaded=True)
+    finally:
+        poller.stop()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
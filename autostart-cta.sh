@@ -2,17 +2,17 @@
 set -e
 
 APP_DIR="/home/bilal/cta-display-rpi5"
-DISPLAY_LOG="$APP_DIR/cta.log"
-BACKEND_LOG="$APP_DIR/photo_backend.log"
+# The Python apps write their own rotated logs (cta.log, photo_backend.log);
+# these only hold this script's progress and anything printed outside logging
+# (e.g. an interpreter crash), and are truncated on every start so they stay small
+DISPLAY_LOG="$APP_DIR/cta.stderr"
+BACKEND_LOG="$APP_DIR/photo_backend.stderr"
 
 # Ensure log directory exists
 mkdir -p "$APP_DIR"
 
-# Initialize logs with startup timestamp
-echo "========================================" >> "$DISPLAY_LOG"
-echo "[autostart-cta] Script started at $(date)" >> "$DISPLAY_LOG"
-echo "========================================" >> "$BACKEND_LOG"
-echo "[autostart-cta] Script started at $(date)" >> "$BACKEND_LOG"
+# Start each boot with fresh logs
+echo "[autostart-cta] Script started at $(date)" > "$DISPLAY_LOG"
 
 # Wait for X server to be ready
 echo "[autostart-cta] Waiting for X server..." >> "$DISPLAY_LOG"
@@ -92,12 +92,17 @@ xset s noblank 2>/dev/null || true
 cd "$APP_DIR"
 
 # Start the upload backend in the background if not already running
-if ! pgrep -f "photo_backend.py" > /dev/null; then
-  echo "[autostart-cta] Starting photo_backend.py at $(date)" >> "$BACKEND_LOG"
-  python3 photo_backend.py >> "$BACKEND_LOG" 2>&1 &
-  echo "[autostart-cta] photo_backend.py started with PID $!" >> "$BACKEND_LOG"
+# (gunicorn with gunicorn.conf.py; Flask's development server if it is missing)
+if ! pgrep -f "photo_backend(:app|\.py)" > /dev/null; then
+  echo "[autostart-cta] Starting photo_backend.py at $(date)" > "$BACKEND_LOG"
+  if python3 -c "import gunicorn" 2>/dev/null; then
+    python3 -m gunicorn photo_backend:app >> "$BACKEND_LOG" 2>&1 &
+  else
+    python3 photo_backend.py >> "$BACKEND_LOG" 2>&1 &
+  fi
+  echo "[autostart-cta] photo_backend.py started with PID $!" >> "$DISPLAY_LOG"
 else
-  echo "[autostart-cta] photo_backend.py already running" >> "$BACKEND_LOG"
+  echo "[autostart-cta] photo_backend.py already running" >> "$DISPLAY_LOG"
 fi
 
 # Start the CTA display (foreground)
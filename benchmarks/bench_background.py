@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: background decode/resize, legacy path vs draft-mode pipeline
+
+Each measurement runs in a fresh subprocess so peak RSS is attributable
+to one decode. Test photos are generated once into a temp directory.
+
+Usage:
+    python3 benchmarks/bench_background.py [--screen 800x480] [--sizes 12,48]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Megapixels -> (width, height) at the 4:3 ratio phone cameras use
+PHOTO_SIZES = {
+    12: (4000, 3000),
+    48: (8000, 6000),
+}
+
+
+def make_photo(path: str, size: tuple):
+    """Write a JPEG with enough texture to compress like a real photo."""
+    from PIL import Image
+    
+    w, h = size
+    # Upscaled noise gives photo-like entropy without a 48 MP random array
+    noise = Image.effect_noise((w // 8, h // 8), 64).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((w // 8, h // 8)).convert("RGB")
+    img = Image.blend(noise, gradient, 0.5).resize((w, h), Image.BILINEAR)
+    img.save(path, "JPEG", quality=92)
+
+
+def legacy_load(path: str, screen_w: int, screen_h: int):
+    """The pre-pipeline BackgroundManager path (full decode, full LANCZOS)."""
+    from PIL import Image
+    from image_utils import get_text_color_for_background
+    
+    img = Image.open(path).convert("RGB")
+    text_color = get_text_color_for_background(img)
+    img = img.resize((screen_w, screen_h), Image.LANCZOS)
+    return img, text_color
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB."""
+    # VmHWM resets on exec; ru_maxrss can carry over the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_one(mode: str, path: str, screen_w: int, screen_h: int) -> dict:
+    """Time a single decode in this process and report peak RSS."""
+    from image_utils import load_background_image
+    
+    loader = legacy_load if mode == "legacy" else load_background_image
+    base_rss = peak_rss_kb()
+    start = time.perf_counter()
+    loader(path, screen_w, screen_h)
+    wall = time.perf_counter() - start
+    peak_rss = peak_rss_kb()
+    return {"wall_ms": wall * 1000, "peak_rss_mb": peak_rss / 1024, "delta_rss_mb": (peak_rss - base_rss) / 1024}
+
+
+def measure(mode: str, path: str, screen_w: int, screen_h: int) -> dict:
+    """Run run_one() in a fresh interpreter."""
+    out = subprocess.check_output([
+        sys.executable, __file__, "--child", mode, path, f"{screen_w}x{screen_h}",
+    ])
+    return json.loads(out)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--screen", default="800x480", help="target size, WxH (default: 7\" Pi display)")
+    ap.add_argument(
+        "--sizes", default="12,48",
+        help=f"comma-separated megapixel sizes to test (from {', '.join(map(str, PHOTO_SIZES))})",
+    )
+    ap.add_argument("--repeat", type=int, default=3, help="runs per case (best wall time is reported)")
+    ap.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    
+    if args.child:
+        mode, path, screen = args.child
+        screen_w, screen_h = map(int, screen.split("x"))
+        print(json.dumps(run_one(mode, path, screen_w, screen_h)))
+        return
+    
+    try:
+        sizes = [int(s) for s in args.sizes.split(",")]
+    except ValueError:
+        ap.error(f"--sizes must be comma-separated integers, not {args.sizes!r}")
+    unknown = [mp for mp in sizes if mp not in PHOTO_SIZES]
+    if unknown:
+        ap.error(f"no photo size defined for {', '.join(map(str, unknown))} MP (choose from {', '.join(map(str, PHOTO_SIZES))})")
+    
+    screen_w, screen_h = map(int, args.screen.split("x"))
+    workdir = os.path.join(tempfile.gettempdir(), "cta-bench-photos")
+    os.makedirs(workdir, exist_ok=True)
+    
+    print(f"Screen {screen_w}x{screen_h}, best of {args.repeat}")
+    print(f"  {'input':<8}{'path':<10}{'wall ms':>10}{'peak RSS MB':>14}{'decode RSS MB':>16}")
+    for mp in sizes:
+        path = os.path.join(workdir, f"photo-{mp}mp.jpg")
+        if not os.path.exists(path):
+            make_photo(path, PHOTO_SIZES[mp])
+        
+        for mode in ("legacy", "draft"):
+            runs = [measure(mode, path, screen_w, screen_h) for _ in range(args.repeat)]
+            wall = min(r["wall_ms"] for r in runs)
+            peak = max(r["peak_rss_mb"] for r in runs)
+            delta = max(r["delta_rss_mb"] for r in runs)
+            print(f"  {str(mp) + ' MP':<8}{mode:<10}{wall:>10.1f}{peak:>14.1f}{delta:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
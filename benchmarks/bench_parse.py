@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: CTA arrival-time parsing
+
+Compares cta_time.parse_cta_time with the old dateutil path on the
+ttarrivals payloads in fixtures/ttarrivals.
+
+Usage:
+    python3 benchmarks/bench_parse.py [--repeat 20]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import cta_time  # noqa: E402
+
+FIXTURE_GLOB = os.path.join(BASE_DIR, "fixtures", "ttarrivals", "*.json")
+
+
+def load_timestamps() -> list:
+    """Collect every arrT value from the recorded payloads."""
+    values = []
+    for path in sorted(glob.glob(FIXTURE_GLOB)):
+        with open(path) as f:
+            values.extend(eta["arrT"] for eta in json.load(f)["ctatt"]["eta"])
+    return values
+
+
+def best_of(fn, values: list, repeat: int) -> float:
+    """Best wall time (seconds) to parse every value once."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for v in values:
+            fn(v)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=20, help="timing repetitions (best is reported)")
+    args = ap.parse_args()
+    
+    values = load_timestamps()
+    if not values:
+        sys.exit(f"No fixtures found at {FIXTURE_GLOB}")
+    
+    start = time.perf_counter()
+    from dateutil import parser as dateparser
+    import_ms = (time.perf_counter() - start) * 1000
+    
+    # Both parsers must agree on wall-clock time before we compare speed
+    for v in values:
+        assert cta_time.parse_cta_time(v).replace(tzinfo=None) == dateparser.parse(v), v
+    
+    fast = best_of(cta_time.parse_cta_time, values, args.repeat)
+    slow = best_of(dateparser.parse, values, args.repeat)
+    
+    n = len(values)
+    print(f"{n} ETAs, best of {args.repeat}")
+    print(f"  {'parser':<24}{'total ms':>10}{'us/ETA':>10}")
+    print(f"  {'cta_time.parse_cta_time':<24}{fast * 1000:>10.3f}{fast / n * 1e6:>10.2f}")
+    print(f"  {'dateutil.parser.parse':<24}{slow * 1000:>10.3f}{slow / n * 1e6:>10.2f}")
+    print(f"  speedup: {slow / fast:.1f}x")
+    print(f"  dateutil import: {import_ms:.1f} ms (no longer paid at startup)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: every display hot path, headless
+
+Covers Train Tracker parsing (CTAClient.get_next_trains on the recorded
+payloads in fixtures/ttarrivals, JSON decode included), luminance
+analysis, the BackgroundManager decode/resize path at several photo
+sizes, the bubble/ripple animation steps, the text layer's diffing
+commit against a stub canvas, arrival history range queries, the
+offline timetable lookup and photo_backend's thumbnail cache.
+Nothing opens a Tk window or touches the network.
+
+Timings are the median of several samples with GC paused, after a
+warm-up, with a fixed random seed; "peak KiB" is the largest Python-side
+allocation (NumPy and Pillow buffers included) during one call. Save a
+run with --json and pass it to --compare on a later commit.
+
+Usage:
+    python3 benchmarks/bench_suite.py [--only luminance] [--sizes 2,12,48]
+    python3 benchmarks/bench_suite.py --json before.json
+    python3 benchmarks/bench_suite.py --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+import cta_time  # noqa: E402
+from animations import BubbleAnimation, CrossfadeAnimation, FrameClock, RippleAnimation, render_ripple_frames  # noqa: E402
+from bench_background import PHOTO_SIZES, make_photo  # noqa: E402
+import history  # noqa: E402
+import schedule  # noqa: E402
+import thumbnails  # noqa: E402
+from cta_api import CTAClient  # noqa: E402
+from harness import StubCanvas, StubRoot, print_results, run_case  # noqa: E402
+from image_utils import (  # noqa: E402
+    build_background_derivative,
+    compute_luminance,
+    load_background_image,
+    luminance_map,
+    region_text_styles,
+)
+from render_model import TextLayer, arrival_lines  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BASE_DIR, "fixtures", "ttarrivals")
+SCREEN_W, SCREEN_H = 800, 480
+PHOTO_DIR = os.path.join(tempfile.gettempdir(), "cta-bench-photos")
+
+# Fixture file -> (stop_id, route, destination) the display would query there
+FIXTURE_QUERIES = {
+    "paulina-41310.json": ("30254", "Brn", "loop"),
+    "belmont-41320.json": ("30256", "Brn", "loop"),
+    "clark-lake-40380.json": ("30074", "Brn", "kimball"),
+}
+
+# The text items cta-display.py restyles, as (x0, y0, x1, y1) on an 800x480 screen
+TEXT_REGIONS = {
+    "title": (250, 45, 550, 95),
+    "primary": (250, 190, 550, 290),
+    "secondary": (200, 380, 600, 420),
+}
+
+# Megapixels for photos not covered by bench_background.PHOTO_SIZES
+EXTRA_PHOTO_SIZES = {
+    2: (1600, 1200),
+}
+
+
+# === Fixtures ===
+
+class _FixtureResponse:
+    """The part of requests.Response that CTAClient uses."""
+    
+    def __init__(self, content: bytes):
+        self.content = content
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return json.loads(self.content)
+
+
+class _FixtureSession:
+    """Answers every GET with one recorded payload."""
+    
+    def __init__(self, content: bytes):
+        self.response = _FixtureResponse(content)
+    
+    def get(self, url, params=None, timeout=None):
+        return self.response
+    
+    def close(self):
+        pass
+
+
+def photo_path(megapixels: int) -> str:
+    """Path of a generated test photo, creating it on first use."""
+    os.makedirs(PHOTO_DIR, exist_ok=True)
+    path = os.path.join(PHOTO_DIR, f"photo-{megapixels}mp.jpg")
+    if not os.path.exists(path):
+        size = {**EXTRA_PHOTO_SIZES, **PHOTO_SIZES}[megapixels]
+        make_photo(path, size)
+    return path
+
+
+# === Cases ===
+
+def parse_cases():
+    """CTAClient.get_next_trains on each recorded station payload."""
+    cases = []
+    for filename, (stop_id, route, destination) in FIXTURE_QUERIES.items():
+        with open(os.path.join(FIXTURE_DIR, filename), "rb") as f:
+            content = f.read()
+        
+        # Count down from the moment the payload was recorded, not from today
+        tmst = cta_time.parse_cta_time(json.loads(content)["ctatt"]["tmst"])
+        
+        client = CTAClient("bench", stop_id)
+        client.session = _FixtureSession(content)
+        
+        def fetch(client=client, route=route, destination=destination):
+            return client.get_next_trains(route, destination, max_results=4)
+        
+        cases.append((f"get_next_trains[{filename.split('-')[0]}]", fetch, tmst))
+    return cases
+
+
+def luminance_cases():
+    """Whole-image luminance, the luminance map, and per-region text styles."""
+    img = Image.open(photo_path(2)).convert("RGB").resize((SCREEN_W, SCREEN_H))
+    lum_map = luminance_map(img)
+    return [
+        (f"compute_luminance[{SCREEN_W}x{SCREEN_H}]", lambda: compute_luminance(img)),
+        (f"luminance_map[{SCREEN_W}x{SCREEN_H}]", lambda: luminance_map(img)),
+        ("region_text_styles[3 items]", lambda: region_text_styles(lum_map, TEXT_REGIONS, SCREEN_W, SCREEN_H)),
+    ]
+
+
+def background_cases(sizes):
+    """The decode/resize work BackgroundManager runs on its worker thread."""
+    cases = []
+    for mp in sizes:
+        path = photo_path(mp)
+        cases.append((f"load_background_image[{mp} MP]", lambda path=path: load_background_image(path, SCREEN_W, SCREEN_H)))
+    
+    # Upload-time derivative next to the image: the path the display normally takes
+    derivative_dir = os.path.join(PHOTO_DIR, "derivative")
+    os.makedirs(derivative_dir, exist_ok=True)
+    current = os.path.join(derivative_dir, "current.jpg")
+    with open(photo_path(sizes[0]), "rb") as src, open(current, "wb") as dst:
+        dst.write(src.read())
+    build_background_derivative(current, current, SCREEN_W, SCREEN_H)
+    cases.append(("load_background_image[derivative]", lambda: load_background_image(current, SCREEN_W, SCREEN_H)))
+    return cases
+
+
+def animation_cases():
+    """Animation step functions driven frame by frame against a stub canvas."""
+    canvas = StubCanvas()
+    clock = FrameClock(StubRoot())
+    
+    bubbles = BubbleAnimation(canvas, clock)
+    
+    def bubble_drag_frame():
+        # A finger dragging across the screen: a touch every frame keeps the pool full
+        bubbles.spawn_bubbles(random.randint(0, SCREEN_W), random.randint(0, SCREEN_H))
+        bubbles.step(1.0)
+    
+    background = Image.open(photo_path(2)).convert("RGB").resize((SCREEN_W, SCREEN_H))
+    
+    def ripple_render():
+        # Worker-side cost of one transition, paid once per background
+        render_ripple_frames(background)
+    
+    # Playback only: frames are pre-rendered, and the stub canvas takes them as-is
+    ripple = RippleAnimation(canvas, clock, SCREEN_W, SCREEN_H, photo_factory=lambda frame: frame)
+    ripple.prepare("bench", background)
+    
+    def ripple_transition():
+        # One complete background transition, start to last frame
+        ripple.start("bench", background_id=0)
+        while ripple.step(1.0):
+            pass
+    
+    # Worker-side cost of one crossfade frame (buffers allocated by _load, then reused)
+    fade = CrossfadeAnimation(canvas, clock)
+    fade._load(background, background.transpose(Image.Transpose.FLIP_LEFT_RIGHT))
+    
+    def crossfade_frame():
+        fade._blend(fade.WEIGHT_ONE // 2, 0)
+    
+    return [
+        ("BubbleAnimation.step[drag, full pool]", bubble_drag_frame),
+        ("render_ripple_frames[worker]", ripple_render),
+        ("RippleAnimation[full transition]", ripple_transition),
+        ("CrossfadeAnimation blend[frame]", crossfade_frame),
+    ]
+
+
+def render_cases():
+    """One display tick through the text layer: unchanged, and a countdown change."""
+    img = Image.open(photo_path(2)).convert("RGB").resize((SCREEN_W, SCREEN_H))
+    lum_map = luminance_map(img)
+    
+    def style_fn(regions):
+        return region_text_styles(lum_map, regions, SCREEN_W, SCREEN_H)
+    
+    layer = TextLayer(StubCanvas())
+    layer.add("title", SCREEN_W // 2, 70, ("Helvetica", 36), text="Paulina → Loop")
+    layer.add("primary", SCREEN_W // 2, SCREEN_H // 2, ("Helvetica", 80, "bold"))
+    layer.add("secondary", SCREEN_W // 2, SCREEN_H - 80, ("Helvetica", 28))
+    layer.commit(style_fn)
+    
+    trains = [
+        {"minutes": 3, "is_scheduled": False, "is_delayed": False},
+        {"minutes": 9, "is_scheduled": False, "is_delayed": False},
+    ]
+    later = [{**t, "minutes": t["minutes"] - 1} for t in trains]
+    
+    def tick_unchanged():
+        primary, secondary = arrival_lines(trains)
+        layer.set_text("primary", primary)
+        layer.set_text("secondary", secondary)
+        layer.commit(style_fn)
+    
+    flip = [trains, later]
+    
+    def tick_countdown():
+        # Alternate between two minute values so every call changes both lines
+        flip.reverse()
+        primary, secondary = arrival_lines(flip[0])
+        layer.set_text("primary", primary)
+        layer.set_text("secondary", secondary)
+        layer.commit(style_fn)
+    
+    return [
+        ("TextLayer.commit[unchanged tick]", tick_unchanged),
+        ("TextLayer.commit[countdown change]", tick_countdown),
+    ]
+
+
+def history_cases():
+    """Arrival history range queries over 30 days of synthetic polls (2 stops, 15 s)."""
+    history_dir = os.path.join(tempfile.gettempdir(), "cta-bench-history")
+    t0 = 1_700_000_000
+    days = 30
+    if not history.segment_paths(history_dir):
+        os.makedirs(history_dir, exist_ok=True)
+        polls = np.arange(t0, t0 + days * 86400, 15, dtype="u4")
+        records = np.zeros(len(polls) * 4, dtype=history.RECORD)
+        records["polled_at"] = np.repeat(polls, 4)
+        records["stop_id"] = np.tile([30254, 30254, 30256, 30256], len(polls))
+        records["run"] = np.tile([415, 417, 415, 417], len(polls))
+        records["arrival"] = records["polled_at"] + np.tile([120, 600, 180, 660], len(polls))
+        # One sealed segment per day, as the writer would leave them
+        per_day = 86400 // 15 * 4
+        for day in range(days):
+            seg = records[day * per_day:(day + 1) * per_day]
+            seg.tofile(os.path.join(history_dir, f"{seg['polled_at'][0]}-{seg['polled_at'][-1]}.bin"))
+    
+    start = t0 + 20 * 86400 + 3600
+    
+    return [
+        ("history.query[1 h of 30 days, one stop]", lambda: history.query(history_dir, start, start + 3600, stop_id=30254)),
+        ("history.query[1 day of 30 days]", lambda: history.query(history_dir, start, start + 86400)),
+    ]
+
+
+def schedule_cases():
+    """Offline timetable lookup in a 60-day index (about 150 arrivals a day)."""
+    path = os.path.join(tempfile.gettempdir(), "cta-bench-schedule", "30254-Brn-loop.bin")
+    now = cta_time.now()
+    day0 = int(schedule.service_day_start(now.date()))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    times = np.array(
+        [day0 + d * 86400 + s for d in range(60) for s in range(5 * 3600, 25 * 3600, 480)], dtype="<u4"
+    )
+    times.tofile(path)
+    with open(os.path.splitext(path)[0] + ".json", "w") as f:
+        json.dump({"start": day0, "end": day0 + 60 * 86400, "count": len(times)}, f)
+    index = schedule.ScheduleIndex(path)
+    
+    return [
+        ("ScheduleIndex.next_departures", lambda: index.next_departures(now)),
+    ]
+
+
+def thumbnail_cases(sizes):
+    """Upload-page thumbnails: a cold render per photo size, then a cache hit."""
+    cases = []
+    out = os.path.join(tempfile.gettempdir(), "cta-bench-thumbnail.jpg")
+    for mp in sizes:
+        path = photo_path(mp)
+        cases.append((f"render_thumbnail[{mp} MP]", lambda path=path: thumbnails.render_thumbnail(path, out, 320)))
+    
+    cache = thumbnails.ThumbnailCache(os.path.join(tempfile.gettempdir(), "cta-bench-thumbnails"))
+    path = photo_path(sizes[-1])
+    cache.get(path, 320)
+    cases.append(("ThumbnailCache.get[hit]", lambda: cache.get(path, 320)))
+    return cases
+
+
+# === Main ===
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", help="run only cases whose name contains this text")
+    ap.add_argument("--sizes", default="2,12", help="comma-separated photo megapixels for the decode cases (2, 12, 48)")
+    ap.add_argument("--repeat", type=int, default=7, help="timed samples per case (median is reported)")
+    ap.add_argument("--min-sample-ms", type=float, default=50, help="minimum length of one timed sample")
+    ap.add_argument("--json", metavar="PATH", help="also write results to PATH")
+    ap.add_argument("--compare", metavar="PATH", help="show change against a saved --json run")
+    args = ap.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(",")]
+    for mp in sizes:
+        if mp not in PHOTO_SIZES and mp not in EXTRA_PHOTO_SIZES:
+            sys.exit(f"No photo size defined for {mp} MP")
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["name"]: r for r in json.load(f)["results"]}
+    
+    parse = parse_cases()
+    cases = [(name, fn) for name, fn, _ in parse]
+    cases += luminance_cases() + background_cases(sizes) + animation_cases() + render_cases() + history_cases() + schedule_cases()
+    cases += thumbnail_cases(sizes)
+    if args.only:
+        cases = [(name, fn) for name, fn in cases if args.only in name]
+    
+    # Parsing cases count down from the fixture's recording time
+    fixture_now = {name: tmst for name, _, tmst in parse}
+    real_now = cta_time.now
+    
+    print(f"Python {platform.python_version()} on {platform.machine()}, "
+          f"NumPy {np.__version__}, Pillow {Image.__version__}; "
+          f"median of {args.repeat}, screen {SCREEN_W}x{SCREEN_H}")
+    
+    results = []
+    for name, fn in cases:
+        # Same random stream for every run, so animation cases do identical work
+        random.seed(0)
+        np.random.seed(0)
+        if name in fixture_now:
+            cta_time.now = lambda tmst=fixture_now[name]: tmst
+        try:
+            results.append(run_case(name, fn, args.repeat, args.min_sample_ms / 1000))
+        finally:
+            cta_time.now = real_now
+    
+    print_results(results, baseline)
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": [r._asdict() for r in results],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Shared helpers for the headless benchmarks: stable timing, allocation
+measurement and Tk stand-ins that let display code run without a screen.
+"""
+import gc
+import itertools
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+
+class Result(NamedTuple):
+    """Timing and memory figures for one benchmark case."""
+    name: str
+    loops: int           # calls per timed sample
+    median_us: float     # median time per call
+    min_us: float        # best time per call
+    stdev_pct: float     # sample spread relative to the median
+    peak_kib: float      # peak Python allocations during one call
+
+
+def calibrate(fn: Callable[[], object], min_sample_s: float) -> int:
+    """Number of calls needed for one sample to take at least min_sample_s."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_sample_s or loops >= 1_000_000:
+            return loops
+        loops *= 2
+
+
+def peak_allocation_kib(fn: Callable[[], object]) -> float:
+    """Peak memory allocated through Python (incl. NumPy/Pillow buffers) by one call."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_case(name: str, fn: Callable[[], object], repeat: int = 7, min_sample_s: float = 0.05) -> Result:
+    """
+    Time fn with a warm-up, fixed loop count and GC paused during samples.
+    
+    Args:
+        name: Label printed in the report
+        fn: Zero-argument callable to measure
+        repeat: Number of timed samples (median and best are reported)
+        min_sample_s: Each sample is lengthened to at least this long
+    
+    Returns:
+        Result for the case
+    """
+    fn()  # warm caches, lazy imports, JIT-ish paths in Pillow/NumPy
+    loops = calibrate(fn, min_sample_s)
+    
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    
+    median = statistics.median(samples)
+    spread = statistics.stdev(samples) / median * 100 if len(samples) > 1 and median else 0.0
+    return Result(name, loops, median * 1e6, min(samples) * 1e6, spread, peak_allocation_kib(fn))
+
+
+def print_results(results: List[Result], baseline: Dict[str, dict] = None):
+    """Print a table; with a baseline, add the median change per case."""
+    width = max(len(r.name) for r in results) + 2
+    header = f"  {'case':<{width}}{'median us':>12}{'min us':>12}{'+/-%':>7}{'peak KiB':>11}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    for r in results:
+        line = f"  {r.name:<{width}}{r.median_us:>12.2f}{r.min_us:>12.2f}{r.stdev_pct:>7.1f}{r.peak_kib:>11.1f}"
+        if baseline:
+            base = baseline.get(r.name)
+            if base:
+                line += f"{(r.median_us / base['median_us'] - 1) * 100:>+9.1f}%"
+            else:
+                line += f"{'new':>10}"
+        print(line)
+
+
+# === Tk stand-ins ===
+
+class StubCanvas:
+    """
+    Accepts the tk.Canvas calls the animations make, without a display.
+    
+    Calls are counted (not drawn) so a benchmark can also report how much
+    canvas traffic a step generates.
+    """
+    
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.calls: Dict[str, int] = {}
+    
+    def _count(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+    
+    def _create(self, method: str) -> int:
+        self._count(method)
+        return next(self._ids)
+    
+    def create_oval(self, *args, **kwargs) -> int:
+        return self._create("create_oval")
+    
+    def create_image(self, *args, **kwargs) -> int:
+        return self._create("create_image")
+    
+    def create_text(self, *args, **kwargs) -> int:
+        return self._create("create_text")
+    
+    def coords(self, item, *args):
+        self._count("coords")
+    
+    def itemconfigure(self, item, **kwargs):
+        self._count("itemconfigure")
+    
+    itemconfig = itemconfigure
+    
+    def tag_raise(self, *args):
+        self._count("tag_raise")
+    
+    def tag_lower(self, *args):
+        self._count("tag_lower")
+    
+    def delete(self, *args):
+        self._count("delete")
+    
+    def bbox(self, item):
+        self._count("bbox")
+        return (250, 190, 550, 290)
+
+
+class StubRoot:
+    """Tk root whose after() only records callbacks; benchmarks drive frames by hand."""
+    
+    def __init__(self):
+        self._ids = itertools.count(1)
+    
+    def after(self, delay_ms, callback=None, *args) -> str:
+        return f"after#{next(self._ids)}"
+    
+    def after_cancel(self, after_id: str):
+        pass
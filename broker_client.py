@@ -0,0 +1,127 @@
+"""
+Display-side subscription to arrivals_broker.py (drop-in for FetchWorker)
+"""
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import requests
+
+from arrivals import trains_from_json
+from cta_api import StopQuery
+
+logger = logging.getLogger(__name__)
+
+
+class BrokerSubscriber:
+    """
+    Receives arrivals pushed by the broker over SSE on a daemon thread.
+    
+    Exposes the FetchWorker interface (start/stop/refresh_now/latest,
+    next_delay_s and fetched_at), so the display loop does not care where
+    trains come from. A dropped connection is retried with capped, jittered backoff
+    and reported to the UI as a failed poll (None), which leaves the
+    cached arrivals to go stale naturally.
+    """
+    
+    def __init__(self, broker_url: str, query: StopQuery, read_timeout_s: float = 45, max_backoff_s: float = 60):
+        """
+        Initialize broker subscriber.
+        
+        Args:
+            broker_url: Base URL of arrivals_broker.py, e.g. http://broker-pi:5003
+            query: Stop/route/destination to subscribe to
+            read_timeout_s: Reconnect if nothing (not even a keep-alive) arrives for this long
+            max_backoff_s: Cap on the reconnect delay
+        """
+        self.url = broker_url.rstrip("/") + "/arrivals/stream"
+        self.params = {k: v for k, v in query._asdict().items() if v is not None}
+        self.read_timeout_s = read_timeout_s
+        self.max_backoff_s = max_backoff_s
+        self.results: "queue.Queue[Any]" = queue.Queue()
+        # Broker's poll interval as of the newest result (read alongside latest())
+        self.next_delay_s: Optional[float] = None
+        # Unix time the broker fetched the newest result; a (re)connect replays
+        # the broker's cached event, which can be a whole poll interval old
+        self.fetched_at: Optional[float] = None
+        
+        self.session = requests.Session()
+        self._response: Optional[requests.Response] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="broker-subscribe", daemon=True)
+    
+    def start(self):
+        """Connect in the background."""
+        self._thread.start()
+    
+    def stop(self):
+        """Close the stream and let the thread exit."""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            response.close()
+    
+    def refresh_now(self):
+        """No-op: the broker pushes every poll as soon as it completes."""
+    
+    def latest(self) -> Tuple[bool, Any]:
+        """
+        Drain queued results without blocking (call from the Tk thread).
+        
+        Returns:
+            Tuple of (has_result: bool, result)
+            Only the newest result is returned; older ones are superseded
+        """
+        has_result = False
+        result = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return has_result, result
+            has_result = True
+    
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                self._listen()
+                failures = 0
+            except Exception as e:
+                if self._stop.is_set():
+                    # stop() closed the stream under a blocked read
+                    return
+                logger.warning("Broker connection lost: %s", e)
+                failures += 1
+            
+            # Tell the UI the feed is down, then retry with jittered backoff
+            self.fetched_at = time.time()
+            self.results.put(None)
+            backoff = min(2 ** failures, self.max_backoff_s)
+            self._stop.wait(backoff / 2 + random.uniform(0, backoff / 2))
+    
+    def _listen(self):
+        """Stream events until the connection ends."""
+        with self.session.get(
+            self.url, params=self.params, stream=True, timeout=(5, self.read_timeout_s)
+        ) as response:
+            response.raise_for_status()
+            self._response = response
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if self._stop.is_set():
+                        return
+                    # SSE: "data: <json>" lines carry events; ": ..." lines are keep-alives
+                    if not line or not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):])
+                    trains = trains_from_json(event.get("trains"))
+                    self.next_delay_s = event.get("next_poll_s")
+                    self.fetched_at = event.get("fetched_at", time.time())
+                    self.results.put(trains)
+            finally:
+                self._response = None
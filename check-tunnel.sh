@@ -11,7 +11,7 @@ if curl -s -f http://localhost:5001/health > /dev/null 2>&1; then
 else
     echo "   ✗ Flask backend is NOT responding"
     echo "     - Check if photo_backend.py is running: ps aux | grep photo_backend"
-    echo "     - Check logs: tail /home/bilal/cta-display-rpi5/photo_backend.log"
+    echo "     - Check logs: tail /home/bilal/cta-display-rpi5/photo_backend.log /home/bilal/cta-display-rpi5/photo_backend.stderr"
 fi
 
 echo ""
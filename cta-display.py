@@ -6,23 +6,60 @@ CTA Train ETA Display (Raspberry Pi 5 + 7" touchscreen)
 - Background image comes from /home/bilal/cta-display-rpi5/background/current.jpg
 - Text overlay shows next Brown Line → Loop trains at Paulina
 """
+import logging
 import os
+import threading
+import time
 import tkinter as tk
 from dotenv import load_dotenv
 
-from animations import BubbleAnimation, RippleAnimation
-from cta_api import CTAClient
-from image_utils import BackgroundManager
+# Only light modules up here: the first frame is painted from the on-disk
+# snapshot before NumPy, Pillow and requests are imported (see FIRST PAINT)
+from arrivals import ArrivalsCache
+from fetch_worker import FetchWorker
+from render_model import TextLayer, arrival_lines, scheduled_lines
+from file_watcher import FileWatcher
+import cta_time
+import log_utils
+import metrics
+import snapshot
 
 # === CONFIG ===
 load_dotenv()
 
+BROKER_URL = os.environ.get("BROKER_URL")  # subscribe to arrivals_broker.py instead of polling CTA
 CTA_KEY = os.environ.get("CTA_KEY")
-if not CTA_KEY:
-    raise RuntimeError("CTA_KEY must be set in the environment (.env)")
+if not CTA_KEY and not BROKER_URL:
+    raise RuntimeError("CTA_KEY (or BROKER_URL) must be set in the environment (.env)")
+CTA_BASE_URL = os.environ.get("CTA_BASE_URL")  # mock_cta.py for offline testing (default: CTA)
 PAULINA_LOOP_ROUTE_ID = "30254"      # stop ID for Paulina → Loop
-REFRESH_MS = 15000                   # 15 seconds
+POLL_NEAR_S = 15                     # poll interval when a train is about to arrive
+POLL_FAR_S = 90                      # poll interval when the next train is far away
+POLL_IDLE_S = 300                    # poll interval with no service (e.g. overnight)
+CTA_DAILY_BUDGET = int(os.environ.get("CTA_DAILY_BUDGET", "100000"))  # requests/day for this key
+TICK_MS = 1000                       # local countdown redraw interval
+RESULT_POLL_MS = 100                 # how often the UI drains fetch results
+ARRIVALS_TTL_S = 180                 # drop cached arrivals after this long
+MAX_CACHED_TRAINS = 4                # keep extras so the countdown survives departures
 BACKGROUND_PATH = "/home/bilal/cta-display-rpi5/background/current.jpg"
+LIBRARY_DIR = "/home/bilal/cta-display-rpi5/background/library"
+SNAPSHOT_DIR = "/home/bilal/cta-display-rpi5/state"  # last arrivals + background for cold starts
+HISTORY_DIR = "/home/bilal/cta-display-rpi5/history"  # append-only log of every poll (history.py)
+SCHEDULE_DIR = "/home/bilal/cta-display-rpi5/schedule"  # GTFS index for offline fallback (schedule.py build)
+SLIDESHOW_MS = int(os.environ.get("SLIDESHOW_SECONDS", "300")) * 1000  # 0 disables
+FRAME_CACHE_MB = 32                  # memory budget for decoded slideshow frames
+BACKGROUND_TRANSITION = os.environ.get("BACKGROUND_TRANSITION", "ripple")  # ripple, crossfade or none
+RIPPLE_FRAMES = 20                   # pre-rendered transition frames (~1.1 MB each at 800x480)
+CROSSFADE_S = 0.6                    # crossfade length
+METRICS_PUBLISH_MS = 5000            # how often metrics are written for photo_backend's /metrics
+ARRIVALS_SNAPSHOT_S = 60             # at most one arrivals snapshot write per this long
+LOG_PATH = "/home/bilal/cta-display-rpi5/cta.log"  # rotated at 1 MB, 3 backups kept
+
+# Errors repeated every poll during an outage are deduplicated and rate
+# limited before they reach the SD card; recent lines stay in a RAM ring
+# that photo_backend serves at /logs
+log_ring = log_utils.setup_logging(LOG_PATH)
+logger = logging.getLogger("display")
 
 # === TK SETUP ===
 
@@ -34,6 +71,7 @@ root.attributes("-topmost", True)
 root.attributes("-zoomed", True)
 root.configure(bg="black")
 root.bind("<Escape>", lambda e: root.destroy())  # handy for debugging
+root.report_callback_exception = lambda *exc_info: logger.error("Error in Tk callback", exc_info=exc_info)
 
 screen_w = root.winfo_screenwidth()
 screen_h = root.winfo_screenheight()
@@ -48,43 +86,127 @@ canvas = tk.Canvas(
 )
 canvas.pack(fill="both", expand=True)
 
-# === TEXT ITEMS (on the canvas) ===
+# === FIRST PAINT ===
 
-title_id = canvas.create_text(
-    screen_w // 2,
-    70,
-    text="Paulina → Loop",
-    font=("Helvetica", 36),
-    fill="white",
-)
+# Last background shown, stored screen-sized as PPM, which Tk reads natively
+startup_background = snapshot.load_background(SNAPSHOT_DIR, screen_w, screen_h)
+text_fill = "white"
+if startup_background is not None:
+    startup_background_id = canvas.create_image(0, 0, anchor="nw", image=startup_background.photo)
+    text_fill = startup_background.text_color
 
-primary_id = canvas.create_text(
-    screen_w // 2,
-    screen_h // 2,
-    text="--",
-    font=("Helvetica", 80, "bold"),
-    fill="white",
-)
+# Text is diffed against what is on screen, so unchanged lines cost no Tk
+# calls; drop shadows appear only where the photo behind an item is busy or
+# close to the light/dark threshold
+text_layer = TextLayer(canvas, shadow_offset=2)
+text_layer.add("title", screen_w // 2, 70, ("Helvetica", 36), text="Paulina → Loop", fill=text_fill)
+text_layer.add("primary", screen_w // 2, screen_h // 2, ("Helvetica", 80, "bold"), text="--", fill=text_fill)
+text_layer.add("secondary", screen_w // 2, screen_h - 80, ("Helvetica", 28), text="Loading…", fill=text_fill)
 
-secondary_id = canvas.create_text(
-    screen_w // 2,
-    screen_h - 80,
-    text="Loading…",
-    font=("Helvetica", 28),
-    fill="white",
-)
+# Arrivals between polls are counted down locally from absolute times; the
+# last poll before a restart is shown (with its age) until a fresh one lands
+arrivals_cache = ArrivalsCache(ttl_s=ARRIVALS_TTL_S, stale_after_s=4 * POLL_NEAR_S)
+saved_arrivals = snapshot.load_arrivals(SNAPSHOT_DIR)
+if saved_arrivals is not None and saved_arrivals[1] < ARRIVALS_TTL_S:
+    arrivals_cache.restore(*saved_arrivals)
+    view = arrivals_cache.view()
+    primary_text, secondary_text = arrival_lines(view.trains, view.age_s if view.is_stale else None)
+    text_layer.set_text("primary", primary_text)
+    text_layer.set_text("secondary", secondary_text)
+    # No luminance map yet: keep the snapshot's text color
+    text_layer.commit(lambda regions: {})
+
+root.update()
+first_frame_s = snapshot.process_age_s()
+if first_frame_s is not None:
+    logger.info(
+        "First frame %.2fs after start (background snapshot: %s, arrivals snapshot: %s)",
+        first_frame_s,
+        "yes" if startup_background else "no",
+        "yes" if arrivals_cache.has_polled else "no",
+    )
+    metrics.REGISTRY.gauge(
+        "startup_first_frame_seconds", "Process start to first painted frame"
+    ).set(round(first_frame_s, 3))
+
+# === DEFERRED IMPORTS ===
+
+from animations import BubbleAnimation, CrossfadeAnimation, FrameClock, RippleAnimation  # noqa: E402
+from broker_client import BrokerSubscriber  # noqa: E402
+from cta_api import DEFAULT_BASE_URL, CTAClient, StopQuery  # noqa: E402
+from history import HistoryWriter  # noqa: E402
+from schedule import ScheduleIndex, index_path  # noqa: E402
+from image_utils import BackgroundManager  # noqa: E402
+from poll_scheduler import PollScheduler  # noqa: E402
 
 # === INITIALIZE COMPONENTS ===
 
+# Animation managers, all driven by one frame clock (idle when nothing moves)
+frame_clock = FrameClock(root)
+bubble_anim = BubbleAnimation(canvas, frame_clock)
+# Ripple frames are pre-rendered off-thread for every decoded background;
+# a crossfade blends old and new on a worker during the transition
+ripple_anim = RippleAnimation(canvas, frame_clock, screen_w, screen_h, frames=RIPPLE_FRAMES)
+crossfade_anim = CrossfadeAnimation(canvas, frame_clock, duration_s=CROSSFADE_S)
+
 # Background manager
-background_manager = BackgroundManager(canvas, BACKGROUND_PATH, screen_w, screen_h)
+background_manager = BackgroundManager(
+    canvas, BACKGROUND_PATH, screen_w, screen_h,
+    library_dir=LIBRARY_DIR,
+    cache_budget_bytes=FRAME_CACHE_MB * 1024 * 1024,
+    on_frame_ready=(
+        (lambda key, frame: ripple_anim.prepare(key, frame.image))
+        if BACKGROUND_TRANSITION == "ripple" else None
+    ),
+    snapshot_dir=SNAPSHOT_DIR,
+)
+if startup_background is not None:
+    # The first decoded frame replaces the snapshot in place, without a transition
+    background_manager.adopt_placeholder(startup_background_id, startup_background.photo)
+
+# Set from the watcher thread when current.jpg is replaced; drained by poll_results
+background_changed = threading.Event()
+background_changed.set()  # initial load
+background_watcher = FileWatcher(BACKGROUND_PATH, background_changed.set)
+
+# Arrivals come either from the shared broker or from polling CTA directly;
+# both run on a background thread and expose the same latest() interface
+stop_query = StopQuery(PAULINA_LOOP_ROUTE_ID, "Brn", "loop", max_results=MAX_CACHED_TRAINS)
+if BROKER_URL:
+    fetch_worker = BrokerSubscriber(BROKER_URL, stop_query)
+else:
+    cta_client = CTAClient(CTA_KEY, PAULINA_LOOP_ROUTE_ID, base_url=CTA_BASE_URL or DEFAULT_BASE_URL)
+    # Poll faster when a train is near, back off on failures, stay within the key's quota
+    poll_scheduler = PollScheduler(
+        near_s=POLL_NEAR_S,
+        far_s=POLL_FAR_S,
+        idle_s=POLL_IDLE_S,
+        daily_budget=CTA_DAILY_BUDGET,
+    )
+    fetch_worker = FetchWorker(
+        lambda: cta_client.get_arrivals([stop_query])[stop_query],
+        POLL_NEAR_S,
+        scheduler=poll_scheduler,
+    )
 
-# Animation managers
-bubble_anim = BubbleAnimation(canvas, root)
-ripple_anim = None  # Will be initialized after first background load
+# Timetable shown (labeled "Scheduled") while there is no live data at all
+try:
+    schedule_index = ScheduleIndex(index_path(SCHEDULE_DIR, PAULINA_LOOP_ROUTE_ID, "Brn", "loop"))
+    if not schedule_index.covers(cta_time.now()):
+        logger.warning("Schedule index does not cover today; rebuild it with schedule.py build")
+except (OSError, ValueError, KeyError) as e:
+    logger.warning("No offline schedule (%s); outages will show No Data", e)
+    schedule_index = None
 
-# CTA API client
-cta_client = CTAClient(CTA_KEY, PAULINA_LOOP_ROUTE_ID)
+# Every poll is logged for later analysis (`python3 history.py --stop ...`);
+# writes are batched every few minutes to spare the SD card
+history_writer = HistoryWriter(HISTORY_DIR)
+
+# Display-side metrics, published to tmpfs and served by photo_backend's /metrics
+last_update_gauge = metrics.REGISTRY.gauge(
+    "last_update_timestamp_seconds", "Unix time of the last completed display update"
+)
+frame_fps_gauge = metrics.REGISTRY.gauge("frame_rate", "Current adaptive animation frame rate")
 
 # Touch/click handlers
 def on_touch(x: int, y: int):
@@ -97,82 +219,178 @@ canvas.bind("<B1-Motion>", lambda e: on_touch(e.x, e.y))
 
 # === UPDATE LOOP ===
 
-def format_minutes_text(minutes: int) -> str:
-    unit = "min" if minutes == 1 else "mins"
-    return f"{minutes} {unit} away"
+def render_trains(trains, stale_age_s=None):
+    """Draw the latest arrivals (runs on the Tk thread)."""
+    primary_text, secondary_text = arrival_lines(trains, stale_age_s)
+    text_layer.set_text("primary", primary_text)
+    text_layer.set_text("secondary", secondary_text)
+    text_layer.commit(background_manager.text_styles)
+
 
+def render_arrivals():
+    """Redraw from the cache with freshly computed countdowns."""
+    view = arrivals_cache.view()
+    if view.trains is None and schedule_index is not None:
+        # No live data (outage, or cached data expired): fall back to the timetable
+        scheduled = schedule_index.next_departures(cta_time.now())
+        if scheduled is not None:
+            primary_text, secondary_text = scheduled_lines(scheduled)
+            text_layer.set_text("primary", primary_text)
+            text_layer.set_text("secondary", secondary_text)
+            text_layer.commit(background_manager.text_styles)
+            return
+    render_trains(view.trains, view.age_s if view.is_stale else None)
 
-def update():
-    global ripple_anim
+
+def apply_background(was_updated: bool, text_color):
+    """React to a freshly swapped-in background (runs on the Tk thread)."""
+    # Update text colors if background changed
+    if text_color:
+        text_layer.invalidate_styles()
+        text_layer.commit(background_manager.text_styles)
     
+    # Transition on background updates (not first load); the outgoing image
+    # is released right away unless the crossfade needs it
+    previous = background_manager.take_previous()
+    if not was_updated:
+        return
+    if BACKGROUND_TRANSITION == "ripple":
+        ripple_anim.start(background_manager.background_key, background_manager.get_background_id())
+    elif BACKGROUND_TRANSITION == "crossfade" and previous is not None:
+        old_frame, old_photo = previous
+        crossfade_anim.start(
+            old_frame.image, old_photo,
+            background_manager.background_frame.image,
+            background_manager.get_background_id(),
+        )
+
+
+# Newest successful poll not yet written to the snapshot, as (trains, fetched_at),
+# and monotonic time of the last write; a snapshot older than ARRIVALS_TTL_S
+# is never restored, so writing every poll would only wear the SD card
+unsaved_arrivals = None
+arrivals_snapshot_at = None
+
+
+def save_arrivals_snapshot(trains, fetched_at: float):
+    """Persist a successful poll for the next cold start (at most every ARRIVALS_SNAPSHOT_S)."""
+    global unsaved_arrivals
+    unsaved_arrivals = (trains, fetched_at)
+    if arrivals_snapshot_at is not None and time.monotonic() - arrivals_snapshot_at < ARRIVALS_SNAPSHOT_S:
+        return
+    flush_arrivals_snapshot()
+
+
+def flush_arrivals_snapshot():
+    """Write the newest poll's snapshot now, if it is not on disk yet."""
+    global unsaved_arrivals, arrivals_snapshot_at
+    if unsaved_arrivals is None:
+        return
+    trains, fetched_at = unsaved_arrivals
+    unsaved_arrivals = None
+    arrivals_snapshot_at = time.monotonic()
     try:
-        trains = cta_client.get_next_trains()
-        was_updated, text_color = background_manager.update_if_needed()
-        
-        # Initialize ripple animation after first background load
-        if ripple_anim is None and background_manager.get_background_id() is not None:
-            ripple_anim = RippleAnimation(
-                canvas, root, screen_w, screen_h,
-                background_manager.get_background_id(), title_id
+        # Stamped with the poll time, so a late write does not make the data look fresh
+        snapshot.save_arrivals(SNAPSHOT_DIR, trains, saved_at=fetched_at)
+    except OSError as e:
+        logger.error("Error saving arrivals snapshot: %s", e)
+
+
+# Poll time of the newest result written to the history
+last_history_poll = 0.0
+
+
+def record_history(trains, fetched_at: float):
+    """Log a poll at its real poll time, once (broker reconnects replay the last event)."""
+    global last_history_poll
+    if fetched_at <= last_history_poll:
+        return
+    last_history_poll = fetched_at
+    history_writer.append(PAULINA_LOOP_ROUTE_ID, trains, polled_at=fetched_at)
+
+
+def poll_results():
+    """Drain finished work from the workers; never blocks on network or decode."""
+    try:
+        # Coalesce watcher events that arrive while a decode is in flight
+        if background_changed.is_set() and not background_manager.is_loading():
+            background_changed.clear()
+            background_manager.request_reload_if_changed()
+        if background_manager.is_loading():
+            apply_background(*background_manager.collect())
+    except Exception:
+        logger.exception("Unexpected error applying background")
+    
+    try:
+        has_result, trains = fetch_worker.latest()
+        if has_result:
+            # A broker (re)connect replays its last event, which may be minutes old
+            fetched_at = fetch_worker.fetched_at or time.time()
+            arrivals_cache.update(
+                trains, next_poll_s=fetch_worker.next_delay_s, age_s=time.time() - fetched_at
             )
-        
-        # Update text colors if background changed
-        if text_color:
-            canvas.itemconfigure(title_id, fill=text_color)
-            canvas.itemconfigure(primary_id, fill=text_color)
-            canvas.itemconfigure(secondary_id, fill=text_color)
-        
-        # Trigger ripple effect on background updates (not first load)
-        if was_updated and ripple_anim:
-            ripple_anim.start()
-
-        if trains is None:
-            canvas.itemconfigure(primary_id, text="--")
-            canvas.itemconfigure(secondary_id, text="No Data")
-        elif not trains:
-            canvas.itemconfigure(primary_id, text="No trains")
-            canvas.itemconfigure(secondary_id, text="No service to Loop")
-        else:
-            first = trains[0]
-
-            if first["is_scheduled"] or first["is_delayed"]:
-                canvas.itemconfigure(primary_id, text="No trains")
-                canvas.itemconfigure(
-                    secondary_id, text="Check service alerts"
-                )
-            else:
-                canvas.itemconfigure(
-                    primary_id,
-                    text=format_minutes_text(first["minutes"]),
-                )
-
-            if len(trains) > 1:
-                second = trains[1]
-                if second["is_scheduled"]:
-                    canvas.itemconfigure(
-                        secondary_id, text="No other train inbound"
-                    )
-                else:
-                    canvas.itemconfigure(
-                        secondary_id,
-                        text=f"Next: {format_minutes_text(second['minutes'])}",
-                    )
-            else:
-                canvas.itemconfigure(
-                    secondary_id, text="No additional trains"
-                )
-
-    except Exception as e:
-        print(f"Unexpected error in update(): {e}")
-        canvas.itemconfigure(primary_id, text="--")
-        canvas.itemconfigure(secondary_id, text="Error")
-
-    root.after(REFRESH_MS, update)
+            render_arrivals()
+            if trains is not None:
+                save_arrivals_snapshot(trains, fetched_at)
+                record_history(trains, fetched_at)
+    except Exception:
+        logger.exception("Unexpected error rendering trains")
+        text_layer.set_text("primary", "--")
+        text_layer.set_text("secondary", "Error")
+        text_layer.commit(background_manager.text_styles)
+    
+    root.after(RESULT_POLL_MS, poll_results)
+
+
+def advance_slideshow():
+    """Rotate to the next library photo (prefetched, so this is just a swap)."""
+    try:
+        if background_manager.advance_slideshow():
+            apply_background(*background_manager.collect())
+    except Exception:
+        logger.exception("Unexpected error advancing slideshow")
+    
+    root.after(SLIDESHOW_MS, advance_slideshow)
+
+
+def tick():
+    """Advance the local countdown once per second."""
+    try:
+        # Leave "Loading…" up until the first poll has come back
+        if arrivals_cache.has_polled:
+            render_arrivals()
+        # Heartbeat: /health reports the display as stale when this stops moving
+        last_update_gauge.set(time.time())
+    except Exception:
+        logger.exception("Unexpected error rendering trains")
+    
+    root.after(TICK_MS, tick)
+
+
+def publish_metrics():
+    """Write the metrics registry and recent log lines to tmpfs for photo_backend to serve."""
+    try:
+        frame_fps_gauge.set(round(frame_clock.fps, 2))
+        metrics.publish()
+        log_utils.publish_ring(log_ring)
+    except OSError as e:
+        logger.error("Error publishing metrics: %s", e)
+    
+    root.after(METRICS_PUBLISH_MS, publish_metrics)
 
 
 # === MAIN ===
 
-# Initial background load
-background_manager.update_if_needed()
-update()
-root.mainloop()
\ No newline at end of file
+# Initial background load (decoded off-thread, swapped in by poll_results)
+fetch_worker.start()
+background_watcher.start()
+poll_results()
+root.after(TICK_MS, tick)
+root.after(METRICS_PUBLISH_MS, publish_metrics)
+if SLIDESHOW_MS > 0:
+    root.after(SLIDESHOW_MS, advance_slideshow)
+root.mainloop()
+fetch_worker.stop()
+background_watcher.stop()
+flush_arrivals_snapshot()
+history_writer.close()
@@ -1,27 +1,62 @@
 """
 CTA Train Tracker API Client
 """
-from datetime import datetime
-from typing import Optional, List, Dict
+import logging
+from typing import Optional, List, Dict, NamedTuple
 import requests
-from dateutil import parser as dateparser
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
+import cta_time
+from arrivals import minutes_until
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Real Train Tracker endpoint; point CTA_BASE_URL at mock_cta.py to test offline
+DEFAULT_BASE_URL = "http://lapi.transitchicago.com/api/1.0/ttarrivals.aspx"
+
+API_LATENCY = REGISTRY.histogram("api_request_seconds", "Train Tracker request latency")
+JSON_PARSE_TIME = REGISTRY.histogram("api_json_parse_seconds", "Train Tracker response JSON decode time")
+API_FAILURES = REGISTRY.counter("api_failures_total", "Failed Train Tracker requests by reason")
+
+
+class StopQuery(NamedTuple):
+    """One stop/route/destination combination to show on the display."""
+    stop_id: str
+    route: str = "Brn"
+    destination: str = "loop"
+    map_id: Optional[str] = None
+    max_results: int = 2
+
 
 class CTAClient:
     """Client for fetching CTA train arrival data."""
     
-    def __init__(self, api_key: str, stop_id: str):
+    def __init__(self, api_key: str, stop_id: Optional[str] = None, pool_size: int = 2, base_url: str = DEFAULT_BASE_URL):
         """
         Initialize CTA API client.
         
         Args:
             api_key: CTA API key
-            stop_id: Station stop ID (e.g., "30254" for Paulina → Loop)
+            stop_id: Default station stop ID (e.g., "30254" for Paulina → Loop)
+            pool_size: Number of keep-alive connections kept open to the API
+            base_url: ttarrivals endpoint (e.g. a local mock_cta.py server)
         """
         self.api_key = api_key
         self.stop_id = stop_id
-        self.base_url = "http://lapi.transitchicago.com/api/1.0/ttarrivals.aspx"
+        self.base_url = base_url
+        
+        # One pooled session for the life of the client so every poll reuses
+        # the same TCP connection instead of doing a fresh handshake.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
     
     def get_next_trains(self, route: str = "Brn", destination: str = "loop", max_results: int = 2) -> Optional[List[Dict]]:
         """
@@ -33,59 +68,116 @@ class CTAClient:
             max_results: Maximum number of trains to return
         
         Returns:
-            List of train dicts with keys: minutes, is_scheduled, is_delayed
+            List of train dicts with keys: minutes, arrival, is_scheduled, is_delayed
             Returns None if API call fails
         """
+        query = StopQuery(self.stop_id, route, destination, max_results=max_results)
+        return self.get_arrivals([query])[query]
+    
+    def get_arrivals(self, queries: List[StopQuery]) -> Dict[StopQuery, Optional[List[Dict]]]:
+        """
+        Fetch upcoming trains for several stops with as few requests as possible.
+        
+        Train Tracker takes a single mapid or stpid per request, but a mapid
+        query returns every platform at that station. Queries sharing a
+        map_id are therefore batched into one request and the response is
+        split per stop/route/destination; queries without a map_id fall back
+        to one stpid request each.
+        
+        Args:
+            queries: Stops to fetch
+        
+        Returns:
+            Dict mapping each query to its train list (same format as
+            get_next_trains), or None for queries whose request failed
+        """
+        groups: Dict[tuple, List[StopQuery]] = {}
+        for query in queries:
+            key = ("mapid", query.map_id) if query.map_id else ("stpid", query.stop_id)
+            groups.setdefault(key, []).append(query)
+        
+        results: Dict[StopQuery, Optional[List[Dict]]] = {}
+        for (param, value), group in groups.items():
+            etas = self._fetch_etas({param: value})
+            for query in group:
+                results[query] = None if etas is None else self._parse_trains(etas, query)
+        return results
+    
+    def _fetch_etas(self, id_params: Dict[str, str]) -> Optional[List[Dict]]:
+        """
+        Perform one ttarrivals request on the pooled session.
+        
+        Returns:
+            Raw list of ETA dicts, or None if the request failed
+        """
         params = {
             "key": self.api_key,
-            "stpid": self.stop_id,
-            "max": max_results,
             "outputType": "JSON",
+            **id_params,
         }
         
         try:
-            r = requests.get(self.base_url, params=params, timeout=10)
+            with API_LATENCY.time():
+                r = self.session.get(self.base_url, params=params, timeout=10)
             r.raise_for_status()
         except RequestException as e:
-            print(f"Error talking to CTA API: {e}")
+            logger.error("Error talking to CTA API: %s", e)
+            API_FAILURES.inc(reason="http")
             return None
         
         try:
-            data = r.json()
-            etas = data["ctatt"]["eta"]
+            with JSON_PARSE_TIME.time():
+                ctatt = r.json()["ctatt"]
         except Exception as e:
-            print(f"Error parsing CTA API response: {e}")
+            logger.error("Error parsing CTA API response: %s", e)
+            API_FAILURES.inc(reason="parse")
+            return None
+        
+        if str(ctatt.get("errCd", "0")) != "0":
+            logger.error("CTA API error %s: %s", ctatt.get("errCd"), ctatt.get("errNm"))
+            API_FAILURES.inc(reason="api_error")
             return None
         
-        now = datetime.now()
+        # A stop with no predictions comes back without an "eta" key
+        return ctatt.get("eta", [])
+    
+    def _parse_trains(self, etas: List[Dict], query: StopQuery) -> List[Dict]:
+        """Filter raw ETAs down to one stop/route/destination."""
+        now = cta_time.now()
         trains = []
         
         for eta in etas:
+            # Filter by stop (batched station queries contain every platform)
+            if query.stop_id and str(eta.get("stpId", query.stop_id)) != str(query.stop_id):
+                continue
+            
             # Filter by route
-            if eta.get("rt") != route:
+            if eta.get("rt") != query.route:
                 continue
             
             # Filter by destination
             dest = eta.get("destNm", "").lower()
-            if destination.lower() not in dest:
+            if query.destination.lower() not in dest:
                 continue
             
             # Parse arrival time
             try:
-                arr = dateparser.parse(eta["arrT"])
-            except Exception:
+                arr = cta_time.parse_cta_time(eta["arrT"])
+            except (KeyError, TypeError, ValueError):
                 continue
             
             # Calculate minutes until arrival
-            diff = int((arr - now).total_seconds() // 60)
+            diff = minutes_until(arr, now)
             if diff < 0:
                 continue
             
             trains.append({
                 "minutes": diff,
+                "arrival": arr,
+                "run": eta.get("rn"),
                 "is_scheduled": str(eta.get("isSch", "0")) == "1",
                 "is_delayed": str(eta.get("isDly", "0")) == "1",
             })
         
         trains.sort(key=lambda t: t["minutes"])
-        return trains[:max_results]
\ No newline at end of file
+        return trains[:query.max_results]
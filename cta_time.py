@@ -0,0 +1,55 @@
+"""
+Timestamp helpers for CTA Train Tracker data
+"""
+from datetime import datetime, tzinfo
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    CHICAGO: Optional[tzinfo] = ZoneInfo("America/Chicago")
+except (ImportError, ZoneInfoNotFoundError):
+    # No tz database: fall back to naive local time (the Pi runs on Chicago time)
+    CHICAGO = None
+
+
+def now() -> datetime:
+    """Current time in the timezone CTA timestamps are expressed in."""
+    return datetime.now(CHICAGO)
+
+
+def parse_cta_time(value: str) -> datetime:
+    """
+    Parse a Train Tracker timestamp such as "2024-01-15T14:30:45".
+    
+    CTA always sends local Chicago time in that fixed ISO layout, which
+    the C-implemented datetime.fromisoformat handles directly; dateutil is
+    only imported as a fallback for anything unexpected.
+    
+    Args:
+        value: Timestamp string from an "arrT"/"prdt" field
+    
+    Returns:
+        Timezone-aware datetime (naive if no tz database is available)
+    
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=CHICAGO)
+    except ValueError:
+        try:
+            from dateutil import parser as dateparser
+        except ImportError:
+            raise ValueError(f"Unrecognized CTA timestamp: {value!r}")
+        try:
+            parsed = dateparser.parse(value)
+        except (ValueError, OverflowError) as e:
+            raise ValueError(f"Unrecognized CTA timestamp: {value!r}") from e
+    
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=CHICAGO)
+    if CHICAGO is None:
+        return parsed.astimezone().replace(tzinfo=None)
+    return parsed.astimezone(CHICAGO)
@@ -0,0 +1,92 @@
+"""
+Background worker that keeps network I/O off the Tk main loop
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FetchWorker:
+    """Runs a fetch function on a daemon thread and queues its results for the UI."""
+    
+    def __init__(self, fetch: Callable[[], Any], interval_s: float, scheduler: Optional[Any] = None):
+        """
+        Initialize fetch worker.
+        
+        Args:
+            fetch: Blocking callable that performs the network request
+            interval_s: Seconds to wait between fetches (without a scheduler)
+            scheduler: Object with next_delay(result) -> seconds (e.g. PollScheduler)
+                that picks each wait from the previous result
+        """
+        self.fetch = fetch
+        self.interval_s = interval_s
+        self.scheduler = scheduler
+        self.results: "queue.Queue[Any]" = queue.Queue()
+        # Wait chosen after the newest queued result (read alongside latest())
+        self.next_delay_s = interval_s
+        # Unix time the newest queued result was fetched (read alongside latest())
+        self.fetched_at: Optional[float] = None
+        
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cta-fetch", daemon=True)
+    
+    def start(self):
+        """Start polling in the background."""
+        self._thread.start()
+    
+    def stop(self):
+        """Ask the worker to exit after the current fetch."""
+        self._stop.set()
+        self._wake.set()
+    
+    def refresh_now(self):
+        """Skip the rest of the current wait and fetch immediately."""
+        self._wake.set()
+    
+    def latest(self) -> Tuple[bool, Any]:
+        """
+        Drain queued results without blocking (call from the Tk thread).
+        
+        Returns:
+            Tuple of (has_result: bool, result)
+            Only the newest result is returned; older ones are superseded
+        """
+        has_result = False
+        result = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return has_result, result
+            has_result = True
+    
+    def _run(self):
+        """Fetch loop: fetch, publish, wait, repeat."""
+        while not self._stop.is_set():
+            fetched_at = time.time()
+            try:
+                result = self.fetch()
+            except Exception:
+                logger.exception("Unexpected error in fetch worker")
+                result = None
+            
+            delay = self.interval_s
+            if self.scheduler is not None:
+                try:
+                    delay = self.scheduler.next_delay(result)
+                except Exception:
+                    logger.exception("Unexpected error in poll scheduler")
+            
+            # Set before publishing so the UI never pairs a result with a stale delay
+            self.next_delay_s = delay
+            self.fetched_at = fetched_at
+            self.results.put(result)
+            
+            self._wake.wait(delay)
+            self._wake.clear()
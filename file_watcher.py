@@ -0,0 +1,187 @@
+"""
+Event-driven file change watcher (inotify on Linux, stat polling elsewhere)
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """libc with inotify symbols, or None on platforms without it."""
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    Calls on_change once a watched file has been replaced or rewritten.
+    
+    Watches the parent directory, so an atomic os.replace() onto the file
+    (IN_MOVED_TO) is seen as well as in-place writes (IN_CLOSE_WRITE).
+    Events are debounced: the callback fires only after debounce_s without
+    further events, so partial writes and bursts of uploads collapse into
+    a single notification. on_change runs on the watcher thread.
+    """
+    
+    def __init__(self, path: str, on_change: Callable[[], None], debounce_s: float = 0.3, poll_interval_s: float = 5.0):
+        """
+        Initialize file watcher.
+        
+        Args:
+            path: File to watch (need not exist yet)
+            on_change: Called after the file settles following a change
+            debounce_s: Quiet period required before notifying
+            poll_interval_s: Stat interval when inotify is unavailable
+        """
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce_s = debounce_s
+        self.poll_interval_s = poll_interval_s
+        
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+    
+    def start(self):
+        """Start watching in the background."""
+        self._thread.start()
+    
+    def stop(self):
+        """Stop watching (takes effect within a second)."""
+        self._stop.set()
+    
+    def _run(self):
+        fd = self._init_inotify()
+        if fd is None:
+            logger.info("inotify unavailable, polling %s every %ss", self.path, self.poll_interval_s)
+            self._run_polling()
+            return
+        try:
+            self._run_inotify(fd)
+        finally:
+            os.close(fd)
+    
+    # === inotify ===
+    
+    def _init_inotify(self) -> Optional[int]:
+        """Create an inotify fd watching the file's directory, or None."""
+        libc = _load_libc()
+        if libc is None:
+            return None
+        
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    
+    def _read_events(self, fd: int) -> Tuple[bool, bool]:
+        """
+        Drain pending inotify events.
+        
+        Returns:
+            Tuple of (touched: bool, watch_gone: bool)
+        """
+        name = os.fsencode(os.path.basename(self.path))
+        touched = False
+        watch_gone = False
+        while True:
+            try:
+                buf = os.read(fd, 4096)
+            except BlockingIOError:
+                return touched, watch_gone
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                event_name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & (IN_DELETE_SELF | IN_IGNORED):
+                    watch_gone = True
+                elif event_name == name:
+                    touched = True
+    
+    def _run_inotify(self, fd: int):
+        deadline: Optional[float] = None  # when the pending change may be reported
+        
+        while not self._stop.is_set():
+            timeout = 1.0 if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([fd], [], [], timeout)
+            
+            if readable:
+                touched, watch_gone = self._read_events(fd)
+                if watch_gone:
+                    # Directory was removed; degrade to polling rather than going blind
+                    self._run_polling()
+                    return
+                if touched:
+                    # Each event pushes the deadline out (debounce + coalesce)
+                    deadline = time.monotonic() + self.debounce_s
+            
+            if deadline is not None and time.monotonic() >= deadline:
+                deadline = None
+                self._notify()
+    
+    # === Polling fallback ===
+    
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime, st.st_size
+    
+    def _run_polling(self):
+        last = self._stat()
+        while not self._stop.wait(self.poll_interval_s):
+            current = self._stat()
+            if current == last:
+                continue
+            
+            # Wait until two consecutive stats agree so half-written files are skipped
+            while not self._stop.wait(self.debounce_s):
+                settled = self._stat()
+                if settled == current:
+                    break
+                current = settled
+            
+            last = current
+            self._notify()
+    
+    def _notify(self):
+        try:
+            self.on_change()
+        except Exception:
+            logger.exception("Error in file watcher callback")
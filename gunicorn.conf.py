@@ -0,0 +1,34 @@
+"""
+Production server settings for photo_backend.py
+
+Usage (from the app directory, where gunicorn picks this file up):
+    gunicorn photo_backend:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('BACKEND_PORT', '5001')}"
+
+# Threads overlap slow uploads with page, thumbnail and /health requests
+# (Pillow releases the GIL while decoding). One process by default keeps
+# /metrics counters and the /logs ring in one place and leaves RAM to the
+# display; more workers are safe (uploads serialize on a file lock, the
+# thumbnail cache is shared on disk), but each reports its own metrics.
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "gthread"
+threads = int(os.environ.get("BACKEND_THREADS", "4"))
+
+# Flask, Pillow and NumPy are imported once in the master and shared
+# copy-on-write with the workers
+preload_app = True
+
+# Worker heartbeats go to RAM instead of the SD card
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# The app logs through log_utils (rotated photo_backend.log); no access log
+accesslog = None
+
+
+def on_starting(server):
+    # Once per server, before workers fork (the app is already preloaded)
+    import photo_backend
+    photo_backend.prepare_storage()
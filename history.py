@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Append-only history of observed arrival predictions
+
+Every poll is stored as fixed-size 16-byte records (one per predicted
+train, or one "no trains" marker) in NumPy-readable segment files:
+
+    current.bin                 segment being appended to
+    <first>-<last>.bin          sealed segments, named by poll time range
+
+Appends are buffered in memory and written in batches on a worker thread,
+so the SD card sees one small append every few minutes. When current.bin
+outgrows its size limit it is compacted (repeated identical predictions
+for the same train are dropped) and sealed, and the oldest sealed segments
+are deleted to stay within a total size budget. Queries memory-map only the
+segments overlapping the requested range and binary-search the poll times.
+
+Usage:
+    python3 history.py [--stop 30254] [--minutes 60] [--dir DIR]
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import cta_time
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+RECORD = np.dtype([
+    ("polled_at", "<u4"),  # Unix seconds of the poll
+    ("arrival", "<u4"),    # Unix seconds of the predicted arrival (0 for NO_TRAINS)
+    ("stop_id", "<u4"),
+    ("run", "<u2"),        # CTA run number (0 if unknown)
+    ("flags", "u1"),
+    ("_pad", "u1"),
+])
+
+# Record flags
+SCHEDULED = 1
+DELAYED = 2
+NO_TRAINS = 4
+
+CURRENT = "current.bin"
+SEGMENT_EXT = ".bin"
+
+RECORDS = REGISTRY.counter("history_records_total", "Arrival history records written")
+HISTORY_BYTES = REGISTRY.gauge("history_bytes", "Arrival history size on disk")
+
+
+def _int_or_zero(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def encode(stop_id, trains: List[Dict], polled_at: float) -> np.ndarray:
+    """
+    Records for one poll of one stop.
+    
+    Args:
+        stop_id: CTA stop ID (numeric)
+        trains: Train dicts with "arrival" and flags; empty for no service
+        polled_at: Unix time of the poll
+    
+    Returns:
+        Array of RECORD (a single NO_TRAINS record if trains is empty)
+    """
+    records = np.zeros(max(len(trains), 1), dtype=RECORD)
+    records["polled_at"] = int(polled_at)
+    records["stop_id"] = _int_or_zero(stop_id)
+    if not trains:
+        records["flags"] = NO_TRAINS
+        return records
+    
+    for i, train in enumerate(trains):
+        records[i]["arrival"] = int(train["arrival"].timestamp())
+        records[i]["run"] = _int_or_zero(train.get("run"))
+        records[i]["flags"] = (
+            (SCHEDULED if train.get("is_scheduled") else 0)
+            | (DELAYED if train.get("is_delayed") else 0)
+        )
+    return records
+
+
+def compact(records: np.ndarray) -> np.ndarray:
+    """
+    Drop predictions that repeat the previous one for the same train.
+    
+    For each (stop, run), the first and last sample and every sample whose
+    arrival time changed are kept, so a train's prediction history can still
+    be replayed exactly. Records without a run number and NO_TRAINS markers
+    are always kept. Time order is preserved.
+    """
+    if len(records) < 3:
+        return records
+    
+    order = np.lexsort((records["polled_at"], records["run"], records["stop_id"]))
+    s = records[order]
+    same_train = (s["stop_id"][1:] == s["stop_id"][:-1]) & (s["run"][1:] == s["run"][:-1])
+    
+    keep_sorted = np.ones(len(s), dtype=bool)
+    # Middle samples of a run whose arrival equals the previous sample's
+    repeat = same_train & (s["arrival"][1:] == s["arrival"][:-1])
+    repeat[:-1] &= same_train[1:]  # the last sample of each run is kept
+    repeat[-1] = False
+    keep_sorted[1:] &= ~repeat
+    keep_sorted |= s["run"] == 0
+    
+    keep = np.empty(len(records), dtype=bool)
+    keep[order] = keep_sorted
+    return records[keep]
+
+
+def segment_paths(directory: str) -> List[Tuple[int, int, str]]:
+    """Sealed segments as (first_polled_at, last_polled_at, path), oldest first."""
+    segments = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext != SEGMENT_EXT or name == CURRENT:
+            continue
+        try:
+            first, last = (int(part) for part in stem.split("-"))
+        except ValueError:
+            continue
+        segments.append((first, last, os.path.join(directory, name)))
+    segments.sort()
+    return segments
+
+
+def map_segment(path: str) -> Optional[np.ndarray]:
+    """Read-only memory map of a segment (a torn trailing record is ignored)."""
+    try:
+        count = os.path.getsize(path) // RECORD.itemsize
+    except OSError:
+        return None
+    if count == 0:
+        return None
+    return np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+
+
+def query(directory: str, start: float, end: float, stop_id=None) -> np.ndarray:
+    """
+    Records polled in [start, end), optionally for one stop.
+    
+    Args:
+        directory: History directory
+        start: Unix time, inclusive
+        end: Unix time, exclusive
+        stop_id: Only this stop, if given
+    
+    Returns:
+        Array of RECORD in poll order (a copy; segments are unmapped)
+    """
+    paths = [path for first, last, path in segment_paths(directory) if last >= start and first < end]
+    paths.append(os.path.join(directory, CURRENT))
+    
+    parts = []
+    for path in paths:
+        records = map_segment(path)
+        if records is None:
+            continue
+        # Segments are in poll order, so the range is two binary searches
+        polled = records["polled_at"]
+        lo, hi = np.searchsorted(polled, [start, end])
+        part = records[lo:hi]
+        if stop_id is not None:
+            part = part[part["stop_id"] == _int_or_zero(stop_id)]
+        parts.append(np.array(part))
+    
+    if not parts:
+        return np.zeros(0, dtype=RECORD)
+    return np.concatenate(parts)
+
+
+class HistoryWriter:
+    """
+    Buffers poll records and appends them to the history in batches.
+    
+    append() is cheap and safe to call from the Tk thread; file writes,
+    compaction and retention run on a single worker thread.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        flush_interval_s: float = 300,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        Initialize history writer.
+        
+        Args:
+            directory: History directory (created if missing)
+            flush_interval_s: Longest time records stay buffered in memory
+            segment_bytes: Size at which current.bin is compacted and sealed
+            max_bytes: Total size budget; the oldest sealed segments are deleted beyond it
+        """
+        self.directory = directory
+        self.flush_interval_s = flush_interval_s
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self._buffer: List[np.ndarray] = []
+        self._last_polled_at = 0.0
+        self._last_flush = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        
+        os.makedirs(directory, exist_ok=True)
+        self._current = os.path.join(directory, CURRENT)
+        self._repair()
+    
+    def append(self, stop_id, trains: List[Dict], polled_at: Optional[float] = None):
+        """
+        Buffer one poll's trains (written within flush_interval_s).
+        
+        Args:
+            stop_id: CTA stop ID
+            trains: Train dicts from a successful poll (empty for no service)
+            polled_at: Unix time of the poll (defaults to now)
+        """
+        polled_at = time.time() if polled_at is None else polled_at
+        with self._lock:
+            # Segments must stay sorted by poll time for query()'s binary
+            # search, even if the clock steps back (e.g. NTP sync after boot)
+            polled_at = self._last_polled_at = max(polled_at, self._last_polled_at)
+            self._buffer.append(encode(stop_id, trains, polled_at))
+            due = time.monotonic() - self._last_flush >= self.flush_interval_s
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            self._executor.submit(self._flush)
+    
+    def flush(self):
+        """Write buffered records now and wait for it."""
+        self._executor.submit(self._flush).result()
+    
+    def close(self):
+        """Flush and stop the worker."""
+        self._executor.submit(self._flush)
+        self._executor.shutdown(wait=True)
+    
+    def _repair(self):
+        """Cut a torn trailing record left by a crash mid-append, and resume the poll order."""
+        try:
+            size = os.path.getsize(self._current)
+            if size % RECORD.itemsize:
+                os.truncate(self._current, size - size % RECORD.itemsize)
+        except OSError:
+            pass
+        records = map_segment(self._current)
+        if records is not None:
+            self._last_polled_at = float(records["polled_at"][-1])
+            return
+        # Just sealed (no current.bin): resume from the newest segment's name
+        segments = segment_paths(self.directory)
+        if segments:
+            self._last_polled_at = float(segments[-1][1])
+    
+    def _flush(self):
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+        if not buffer:
+            return
+        
+        records = np.concatenate(buffer)
+        try:
+            with open(self._current, "ab") as f:
+                f.write(records.tobytes())
+            RECORDS.inc(len(records))
+            if os.path.getsize(self._current) >= self.segment_bytes:
+                self._seal()
+            HISTORY_BYTES.set(self._total_bytes())
+        except OSError as e:
+            logger.error("Error writing arrival history: %s", e)
+    
+    def _seal(self):
+        """Compact current.bin into a named segment and enforce the size budget."""
+        records = compact(np.fromfile(self._current, dtype=RECORD))
+        if len(records):
+            name = f"{records['polled_at'][0]}-{records['polled_at'][-1]}{SEGMENT_EXT}"
+            path = os.path.join(self.directory, name)
+            records.tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        os.remove(self._current)
+        
+        segments = segment_paths(self.directory)
+        total = self._total_bytes()
+        while total > self.max_bytes and len(segments) > 1:
+            _, _, oldest = segments.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+    
+    def _total_bytes(self) -> int:
+        total = sum(os.path.getsize(path) for _, _, path in segment_paths(self.directory))
+        if os.path.exists(self._current):
+            total += os.path.getsize(self._current)
+        return total
+
+
+def format_records(records: np.ndarray) -> List[str]:
+    """Human-readable lines: poll time, stop, run, predicted arrival, minutes, flags."""
+    lines = []
+    for r in records:
+        polled = datetime.fromtimestamp(int(r["polled_at"]), cta_time.CHICAGO)
+        if r["flags"] & NO_TRAINS:
+            lines.append(f"{polled:%Y-%m-%d %H:%M:%S}  {r['stop_id']:>6}  no trains")
+            continue
+        arrival = datetime.fromtimestamp(int(r["arrival"]), cta_time.CHICAGO)
+        minutes = (int(r["arrival"]) - int(r["polled_at"])) // 60
+        flags = " ".join(
+            name for bit, name in ((SCHEDULED, "scheduled"), (DELAYED, "delayed")) if r["flags"] & bit
+        )
+        lines.append(
+            f"{polled:%Y-%m-%d %H:%M:%S}  {r['stop_id']:>6}  run {r['run']:>4}  "
+            f"arr {arrival:%H:%M:%S}  {minutes:>3} min  {flags}".rstrip()
+        )
+    return lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dir", default="/home/bilal/cta-display-rpi5/history", help="history directory")
+    ap.add_argument("--stop", help="only this stop ID")
+    ap.add_argument("--minutes", type=float, default=60, help="how far back to look")
+    args = ap.parse_args()
+    
+    end = time.time()
+    records = query(args.dir, end - args.minutes * 60, end + 1, stop_id=args.stop)
+    for line in format_records(records):
+        print(line)
+    print(f"{len(records)} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,36 @@
 """
 Image processing utilities for background and text theming
 """
+import json
+import logging
 import os
+import time
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
-from PIL import Image, ImageTk
-from typing import Optional, Tuple
+from PIL import Image, ImageOps, ImageTk
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import snapshot
+from metrics import REGISTRY
+from render_model import TextStyle
+
+logger = logging.getLogger(__name__)
+
+# Screen-sized derivatives are stored as binary PPM: no compression, so
+# loading one is a straight read with no decode or resampling work.
+DERIVATIVE_EXT = ".ppm"
+SIDECAR_EXT = ".json"
+
+# Side of one luminance-map cell in screen pixels (800x480 -> 50x30 cells)
+LUMINANCE_CELL = 16
+
+# ITU-R BT.709 luminance weights
+BT709 = np.array([0.2126, 0.7152, 0.0722], dtype="float32")
+
+DECODE_TIME = REGISTRY.histogram("background_decode_seconds", "Background decode, orient and resize time")
+LUMINANCE_TIME = REGISTRY.histogram("background_luminance_seconds", "Background luminance analysis time")
 
 
 def compute_luminance(img: Image.Image) -> float:
@@ -40,14 +65,354 @@ def get_text_color_for_background(img: Image.Image, threshold: float = 0.55) ->
     Returns:
         "black" for light backgrounds, "white" for dark backgrounds
     """
-    lum = compute_luminance(img)
+    return text_color_for_luminance(compute_luminance(img), threshold)
+
+
+def text_color_for_luminance(lum: float, threshold: float = 0.55) -> str:
+    """Map a luminance in [0, 1] to "black" (light background) or "white"."""
     return "black" if lum > threshold else "white"
 
 
+def luminance_map(img: Image.Image, cell: int = LUMINANCE_CELL) -> np.ndarray:
+    """
+    Reduced-resolution luminance of a screen-sized image.
+    
+    Computed once per background and shared by every text region.
+    
+    Args:
+        img: Screen-sized RGB image
+        cell: Pixels per map cell along each axis
+    
+    Returns:
+        float32 array of shape (rows, cols) with values in [0, 1]
+    """
+    small = img.reduce(cell) if cell > 1 else img
+    arr = np.asarray(small.convert("RGB"), dtype="float32") / 255.0
+    return arr @ BT709
+
+
+def region_text_styles(
+    lum_map: np.ndarray,
+    regions: Dict[Hashable, Tuple[float, float, float, float]],
+    screen_w: int,
+    screen_h: int,
+    threshold: float = 0.55,
+    shadow_margin: float = 0.15,
+    shadow_spread: float = 0.2,
+) -> Dict[Hashable, TextStyle]:
+    """
+    Pick a text color per region from the luminance underneath it.
+    
+    Region sums come from summed-area tables, so every region costs four
+    lookups regardless of its size and all regions are evaluated in one
+    vectorized pass.
+    
+    Args:
+        lum_map: Output of luminance_map() for the current background
+        regions: Screen-space bounding boxes (x1, y1, x2, y2), e.g. canvas.bbox(item)
+        screen_w: Screen width in pixels
+        screen_h: Screen height in pixels
+        threshold: Luminance threshold for light/dark detection
+        shadow_margin: Use a shadow when mean luminance is this close to threshold
+        shadow_spread: Use a shadow when luminance std-dev exceeds this (busy area)
+    
+    Returns:
+        Dict mapping each region key to its TextStyle
+    """
+    if not regions:
+        return {}
+    
+    rows, cols = lum_map.shape
+    keys = list(regions)
+    boxes = np.array([regions[k] for k in keys], dtype="float64")
+    
+    # Screen pixels -> map cells; every region covers at least one cell
+    x0 = np.clip((boxes[:, 0] * cols / screen_w).astype(int), 0, cols - 1)
+    y0 = np.clip((boxes[:, 1] * rows / screen_h).astype(int), 0, rows - 1)
+    x1 = np.clip(np.ceil(boxes[:, 2] * cols / screen_w).astype(int), x0 + 1, cols)
+    y1 = np.clip(np.ceil(boxes[:, 3] * rows / screen_h).astype(int), y0 + 1, rows)
+    
+    lum = lum_map.astype("float64")
+    sat = np.zeros((rows + 1, cols + 1))
+    sat_sq = np.zeros((rows + 1, cols + 1))
+    sat[1:, 1:] = lum.cumsum(0).cumsum(1)
+    sat_sq[1:, 1:] = (lum * lum).cumsum(0).cumsum(1)
+    
+    def region_sums(table: np.ndarray) -> np.ndarray:
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+    
+    area = (x1 - x0) * (y1 - y0)
+    mean = region_sums(sat) / area
+    std = np.sqrt(np.maximum(region_sums(sat_sq) / area - mean * mean, 0.0))
+    
+    light = mean > threshold
+    shadow = (np.abs(mean - threshold) < shadow_margin) | (std > shadow_spread)
+    
+    return {
+        key: TextStyle(
+            fill="black" if light[i] else "white",
+            shadow=bool(shadow[i]),
+            shadow_fill="white" if light[i] else "black",
+        )
+        for i, key in enumerate(keys)
+    }
+
+
+def scale_to_screen(image_path: str, screen_w: int, screen_h: int) -> Image.Image:
+    """
+    Decode, orient and scale an image to screen size.
+    
+    JPEGs are decoded with draft mode, which lets libjpeg scale by 1/2, 1/4
+    or 1/8 during decoding, so a 48 MP phone photo never exists in memory
+    at full resolution. Other formats are box-reduced before the final
+    LANCZOS pass.
+    
+    Args:
+        image_path: Path to source image file
+        screen_w: Screen width in pixels
+        screen_h: Screen height in pixels
+    
+    Returns:
+        Screen-sized RGB image with EXIF orientation applied
+    """
+    with DECODE_TIME.time():
+        with Image.open(image_path) as src:
+            src.draft("RGB", (screen_w, screen_h))
+            img = ImageOps.exif_transpose(src).convert("RGB")
+        
+        return img.resize((screen_w, screen_h), Image.LANCZOS, reducing_gap=3.0)
+
+
+def derivative_paths(image_path: str) -> Tuple[str, str]:
+    """Paths of the screen-sized derivative and its sidecar for an image."""
+    stem = os.path.splitext(image_path)[0]
+    return stem + DERIVATIVE_EXT, stem + SIDECAR_EXT
+
+
+def build_background_derivative(source_path: str, out_path: str, screen_w: int, screen_h: int) -> Dict:
+    """
+    Pre-render a background so the display can load it without decoding work.
+    
+    Writes <out stem>.ppm (screen-sized, oriented) and <out stem>.json
+    holding the luminance and text color, each via an atomic rename.
+    
+    Args:
+        source_path: Uploaded/original image file
+        out_path: Image path the derivative belongs to (e.g. background/current.jpg)
+        screen_w: Screen width in pixels
+        screen_h: Screen height in pixels
+    
+    Returns:
+        The sidecar dict
+    """
+    source_stat = os.stat(source_path)
+    img = scale_to_screen(source_path, screen_w, screen_h)
+    with LUMINANCE_TIME.time():
+        lum = compute_luminance(img)
+        lum_map = luminance_map(img)
+    sidecar = {
+        "width": screen_w,
+        "height": screen_h,
+        "luminance": lum,
+        "text_color": text_color_for_luminance(lum),
+        "luminance_cell": LUMINANCE_CELL,
+        "luminance_map": np.round(lum_map, 3).tolist(),
+        # Lets the display tell whether the derivative matches the image next to it
+        # (renames and hard links keep both, so library -> current still matches)
+        "source_size": source_stat.st_size,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+    }
+    
+    ppm_path, json_path = derivative_paths(out_path)
+    img.save(ppm_path + ".tmp", "PPM")
+    os.replace(ppm_path + ".tmp", ppm_path)
+    with open(json_path + ".tmp", "w") as f:
+        json.dump(sidecar, f)
+    os.replace(json_path + ".tmp", json_path)
+    
+    return sidecar
+
+
+def read_derivative_sidecar(
+    image_path: str, screen_w: int, screen_h: int, derivative_for: Optional[str] = None
+) -> Optional[Dict]:
+    """
+    Read a derivative's sidecar if it matches the image and screen.
+    
+    Args:
+        image_path: Image the derivative must have been built from
+        screen_w: Screen width in pixels
+        screen_h: Screen height in pixels
+        derivative_for: Path the derivative was stored under (defaults to image_path)
+    
+    Returns:
+        The sidecar dict, or None if missing, stale or built for another screen size
+    """
+    _, json_path = derivative_paths(derivative_for or image_path)
+    try:
+        image_stat = os.stat(image_path)
+        with open(json_path) as f:
+            sidecar = json.load(f)
+        if (
+            sidecar["width"] != screen_w
+            or sidecar["height"] != screen_h
+            or sidecar["source_size"] != image_stat.st_size
+            or sidecar["source_mtime_ns"] != image_stat.st_mtime_ns
+            or sidecar.get("luminance_cell") != LUMINANCE_CELL
+        ):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return sidecar
+
+
+def load_background_derivative(image_path: str, screen_w: int, screen_h: int) -> Optional[Tuple[Image.Image, str, np.ndarray]]:
+    """
+    Load the pre-rendered derivative for an image, if one matches.
+    
+    Returns:
+        Tuple of (screen-sized RGB image, text color, luminance map), or
+        None if there is no derivative or it was built for another image
+        or screen size
+    """
+    sidecar = read_derivative_sidecar(image_path, screen_w, screen_h)
+    if sidecar is None:
+        return None
+    
+    ppm_path, _ = derivative_paths(image_path)
+    try:
+        lum_map = np.asarray(sidecar["luminance_map"], dtype="float32")
+        img = Image.open(ppm_path)
+        img.load()
+    except (OSError, ValueError, KeyError):
+        return None
+    
+    return img, sidecar["text_color"], lum_map
+
+
+class BackgroundFrame(NamedTuple):
+    """A screen-ready background and what the text layer needs to know about it."""
+    image: Image.Image
+    text_color: str
+    luminance_map: np.ndarray
+
+
+def load_background_image(image_path: str, screen_w: int, screen_h: int) -> BackgroundFrame:
+    """
+    Produce a screen-sized background (safe to run off the Tk thread).
+    
+    Uses the upload-time derivative when it matches, otherwise decodes and
+    scales the original.
+    
+    Args:
+        image_path: Path to background image file
+        screen_w: Screen width in pixels
+        screen_h: Screen height in pixels
+    
+    Returns:
+        BackgroundFrame of (screen-sized RGB image, recommended text color, luminance map)
+    """
+    derivative = load_background_derivative(image_path, screen_w, screen_h)
+    if derivative is not None:
+        return BackgroundFrame(*derivative)
+    
+    img = scale_to_screen(image_path, screen_w, screen_h)
+    
+    # Determine text color based on brightness
+    with LUMINANCE_TIME.time():
+        text_color = get_text_color_for_background(img)
+        lum_map = luminance_map(img)
+    return BackgroundFrame(img, text_color, lum_map)
+
+
+def frame_key(image_path: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Cache key identifying a file's current contents, or None if it is missing.
+    
+    Includes the inode, so current.jpg and the library photo it is
+    hard-linked to share one cache entry.
+    """
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class FrameCache:
+    """LRU cache of screen-ready background frames bounded by a memory budget."""
+    
+    def __init__(self, budget_bytes: int):
+        """
+        Initialize frame cache.
+        
+        Args:
+            budget_bytes: Approximate memory the cached frames may use
+        """
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._frames: "OrderedDict[Hashable, BackgroundFrame]" = OrderedDict()
+    
+    @staticmethod
+    def frame_bytes(frame: BackgroundFrame) -> int:
+        img = frame.image
+        return img.width * img.height * len(img.getbands()) + frame.luminance_map.nbytes
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._frames
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def get(self, key: Hashable) -> Optional[BackgroundFrame]:
+        """Look up a frame and mark it most recently used."""
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+        return frame
+    
+    def put(self, key: Hashable, frame: BackgroundFrame):
+        """Insert a frame, evicting least recently used ones over budget."""
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.used_bytes -= self.frame_bytes(old)
+        
+        self._frames[key] = frame
+        self.used_bytes += self.frame_bytes(frame)
+        
+        # Always keep the newest frame, even if it alone exceeds the budget
+        while self.used_bytes > self.budget_bytes and len(self._frames) > 1:
+            _, evicted = self._frames.popitem(last=False)
+            self.used_bytes -= self.frame_bytes(evicted)
+
+
+def library_photos(library_dir: str) -> List[str]:
+    """Library photo paths, oldest first (file names start with a timestamp)."""
+    try:
+        names = sorted(n for n in os.listdir(library_dir) if n.lower().endswith(".jpg"))
+    except OSError:
+        return []
+    return [os.path.join(library_dir, n) for n in names]
+
+
 class BackgroundManager:
-    """Manages background image loading and updates."""
+    """Manages background image loading, updates and the photo slideshow."""
     
-    def __init__(self, canvas: tk.Canvas, image_path: str, screen_w: int, screen_h: int):
+    # The startup snapshot is only a placeholder, so spare the SD card a
+    # full-screen write on every slideshow step
+    SNAPSHOT_INTERVAL_S = 600
+    
+    def __init__(
+        self,
+        canvas: tk.Canvas,
+        image_path: str,
+        screen_w: int,
+        screen_h: int,
+        library_dir: Optional[str] = None,
+        cache_budget_bytes: int = 32 * 1024 * 1024,
+        on_frame_ready: Optional[Callable[[Hashable, BackgroundFrame], None]] = None,
+        snapshot_dir: Optional[str] = None,
+    ):
         """
         Initialize background manager.
         
@@ -56,55 +421,146 @@ class BackgroundManager:
             image_path: Path to background image file
             screen_w: Screen width in pixels
             screen_h: Screen height in pixels
+            library_dir: Directory of uploaded photos to rotate through (optional)
+            cache_budget_bytes: Memory budget for cached screen-sized frames
+            on_frame_ready: Called on the Tk thread with (key, frame) for every
+                decoded or prefetched frame, before it is swapped in (e.g. to
+                prepare a transition for it)
+            snapshot_dir: Where to persist the background on screen for the
+                next cold start (see snapshot.py)
         """
         self.canvas = canvas
         self.image_path = image_path
         self.screen_w = screen_w
         self.screen_h = screen_h
+        self.library_dir = library_dir
+        self.on_frame_ready = on_frame_ready
+        self.snapshot_dir = snapshot_dir
+        self._snapshot_at: Optional[float] = None
         
         self.background_image: Optional[ImageTk.PhotoImage] = None
-        self.background_mtime: float = 0
+        self.background_frame: Optional[BackgroundFrame] = None
+        self.background_key: Optional[Hashable] = None
         self.background_image_id: Optional[int] = None
+        self.luminance_map: Optional[np.ndarray] = None
+        
+        self.cache = FrameCache(cache_budget_bytes)
+        
+        # Decoding and scaling happen on this worker; Pillow releases the GIL
+        # while it works, so the Tk loop keeps animating meanwhile.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bg-decode")
+        # Frame to show as soon as it is ready
+        self._pending: Optional[Tuple[Hashable, Future]] = None
+        # Upcoming slide being decoded ahead of time
+        self._prefetch: Optional[Tuple[Hashable, Future]] = None
+        # Upcoming slide already converted for Tk, so advancing is only a swap
+        self._next_photo: Optional[Tuple[Hashable, ImageTk.PhotoImage]] = None
+        # Outgoing background of the last swap, until take_previous()
+        self._previous: Optional[Tuple[BackgroundFrame, ImageTk.PhotoImage]] = None
     
     def update_if_needed(self) -> Tuple[bool, Optional[str]]:
         """
-        Load or reload background image if file has changed.
+        Start a reload if the file has changed and apply any finished one.
         
         Returns:
             Tuple of (was_updated: bool, text_color: Optional[str])
             text_color is the recommended text color for this background
         """
-        if not os.path.exists(self.image_path):
-            return False, None
+        self.request_reload_if_changed()
+        return self.collect()
+    
+    def request_reload_if_changed(self) -> bool:
+        """
+        Queue a background load if the file has changed (non-blocking).
         
-        try:
-            mtime = os.path.getmtime(self.image_path)
-        except OSError:
-            return False, None
+        Returns:
+            True if a load was queued
+        """
+        # One load at a time; a newer file is picked up on the next check
+        if self._pending is not None:
+            return False
         
-        # No change detected
-        if mtime == self.background_mtime:
-            return False, None
+        key = frame_key(self.image_path)
+        
+        # Missing file or no change detected
+        if key is None or key == self.background_key:
+            return False
+        
+        self._pending = (key, self._load(self.image_path, key))
+        return True
+    
+    def advance_slideshow(self) -> bool:
+        """
+        Queue the next library photo (non-blocking; collect() swaps it in).
+        
+        Rotation only runs while a library photo is on screen, so a reset
+        to the default background stays put until the next upload.
+        
+        Returns:
+            True if a slide change was queued
+        """
+        if self._pending is not None:
+            return False
         
-        self.background_mtime = mtime
+        upcoming = self._upcoming_slide()
+        if upcoming is None:
+            return False
         
+        path, key = upcoming
+        self._pending = (key, self._load(path, key))
+        return True
+    
+    def is_loading(self) -> bool:
+        """Whether a load is in flight or waiting to be collected."""
+        return self._pending is not None or self._prefetch is not None
+    
+    def collect(self) -> Tuple[bool, Optional[str]]:
+        """
+        Swap in a finished load (call from the Tk thread; never blocks).
+        
+        Returns:
+            Tuple of (was_updated: bool, text_color: Optional[str])
+        """
+        self._collect_prefetch()
+        
+        if self._pending is None or not self._pending[1].done():
+            return False, None
+        
+        (key, future), self._pending = self._pending, None
         try:
-            img = Image.open(self.image_path).convert("RGB")
+            frame = future.result()
         except Exception as e:
-            print(f"Error loading background: {e}")
+            logger.error("Error loading background: %s", e)
             return False, None
         
-        # Determine text color based on brightness
-        text_color = get_text_color_for_background(img)
+        self.cache.put(key, frame)
+        self._frame_ready(key, frame)
         
-        # Resize to screen and convert for Tkinter
-        img = img.resize((self.screen_w, self.screen_h), Image.LANCZOS)
-        self.background_image = ImageTk.PhotoImage(img)
+        # Use the prefetched Tk image if this is the slide we prepared
+        if self._next_photo is not None and self._next_photo[0] == key:
+            photo = self._next_photo[1]
+        else:
+            # Only the Tk image conversion and swap run on the UI thread
+            photo = ImageTk.PhotoImage(frame.image)
+        self._next_photo = None
+        
+        result = self._swap(key, frame, photo)
+        self._start_prefetch()
+        return result
+    
+    def _swap(self, key: Hashable, frame: BackgroundFrame, photo: ImageTk.PhotoImage) -> Tuple[bool, Optional[str]]:
+        """Point the canvas at a new background image."""
+        # First load vs update (replacing a startup placeholder is still the first load)
+        is_first_load = self.background_frame is None
         
-        # First load vs update
-        is_first_load = self.background_image_id is None
+        if not is_first_load:
+            self._previous = (self.background_frame, self.background_image)
+        self.background_image = photo
+        self.background_frame = frame
+        self.background_key = key
+        self.luminance_map = frame.luminance_map
         
-        if is_first_load:
+        if self.background_image_id is None:
             self.background_image_id = self.canvas.create_image(
                 0, 0, anchor="nw", image=self.background_image
             )
@@ -114,8 +570,119 @@ class BackgroundManager:
         # Keep background behind other elements
         self.canvas.tag_lower(self.background_image_id)
         
-        return not is_first_load, text_color
+        now = time.monotonic()
+        if self.snapshot_dir and (self._snapshot_at is None or now - self._snapshot_at >= self.SNAPSHOT_INTERVAL_S):
+            # Persisted for the next cold start; written on the decode worker
+            self._snapshot_at = now
+            self._executor.submit(self._save_snapshot, frame)
+        
+        return not is_first_load, frame.text_color
+    
+    def _save_snapshot(self, frame: BackgroundFrame):
+        try:
+            snapshot.save_background(self.snapshot_dir, frame.image, frame.text_color)
+        except OSError as e:
+            logger.error("Error saving background snapshot: %s", e)
+    
+    def adopt_placeholder(self, item_id: int, photo):
+        """
+        Take over a canvas image painted before the manager existed.
+        
+        The first loaded frame replaces it in place (no transition), and
+        text styles stay empty until then.
+        
+        Args:
+            item_id: Canvas image item showing e.g. the startup snapshot
+            photo: The Tk image it shows (kept alive here)
+        """
+        self.background_image_id = item_id
+        self.background_image = photo
+    
+    def take_previous(self) -> Optional[Tuple[BackgroundFrame, ImageTk.PhotoImage]]:
+        """
+        Hand over the background replaced by the last swap (e.g. to fade it out).
+        
+        Returns:
+            Tuple of (frame, photo), or None; later calls return None until the next swap
+        """
+        previous, self._previous = self._previous, None
+        return previous
+    
+    def _load(self, image_path: str, key: Hashable) -> Future:
+        """Future for a frame: already resolved on a cache hit, else a worker decode."""
+        frame = self.cache.get(key)
+        if frame is not None:
+            future: Future = Future()
+            future.set_result(frame)
+            return future
+        return self._executor.submit(load_background_image, image_path, self.screen_w, self.screen_h)
+    
+    def _upcoming_slide(self) -> Optional[Tuple[str, Hashable]]:
+        """(path, key) of the library photo after the one on screen, if rotating."""
+        if not self.library_dir or self.background_key is None:
+            return None
+        
+        photos = [(path, frame_key(path)) for path in library_photos(self.library_dir)]
+        photos = [(path, key) for path, key in photos if key is not None]
+        if len(photos) < 2:
+            return None
+        
+        for i, (_, key) in enumerate(photos):
+            if key == self.background_key:
+                return photos[(i + 1) % len(photos)]
+        return None
+    
+    def _start_prefetch(self):
+        """Decode the upcoming slide in the background so advancing is instant."""
+        if self._prefetch is not None:
+            return
+        upcoming = self._upcoming_slide()
+        if upcoming is None:
+            return
+        path, key = upcoming
+        if self._next_photo is not None and self._next_photo[0] == key:
+            return
+        self._prefetch = (key, self._load(path, key))
+        self._collect_prefetch()
+    
+    def _collect_prefetch(self):
+        """Cache a finished prefetch and prepare its Tk image ahead of the transition."""
+        if self._prefetch is None or not self._prefetch[1].done():
+            return
+        
+        (key, future), self._prefetch = self._prefetch, None
+        try:
+            frame = future.result()
+        except Exception as e:
+            logger.error("Error prefetching background: %s", e)
+            return
+        
+        self.cache.put(key, frame)
+        self._frame_ready(key, frame)
+        self._next_photo = (key, ImageTk.PhotoImage(frame.image))
+    
+    def _frame_ready(self, key: Hashable, frame: BackgroundFrame):
+        if self.on_frame_ready is None:
+            return
+        try:
+            self.on_frame_ready(key, frame)
+        except Exception as e:
+            logger.error("Error preparing background transition: %s", e)
+    
+    def text_styles(self, regions: Dict[Hashable, Tuple[float, float, float, float]]) -> Dict[Hashable, TextStyle]:
+        """
+        Per-region text styles for the current background.
+        
+        Args:
+            regions: Screen-space bounding boxes keyed by e.g. canvas item ID
+        
+        Returns:
+            Dict of TextStyle per region (empty until a background is loaded)
+        """
+        if self.luminance_map is None:
+            return {}
+        return region_text_styles(self.luminance_map, regions, self.screen_w, self.screen_h)
     
     def get_background_id(self) -> Optional[int]:
         """Get the canvas ID of the background image."""
-        return self.background_image_id
\ No newline at end of file
+        return self.background_image_id
@@ -0,0 +1,219 @@
+"""
+Bounded logging for unattended kiosks: dedup, rate limit, ring buffer, rotation
+"""
+import collections
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Where the display publishes its recent log lines for photo_backend's /logs
+# (RAM-backed, next to the published metrics)
+DISPLAY_RING_PATH = os.environ.get(
+    "LOG_RING_PATH",
+    "/dev/shm/cta-display.recent.log" if os.path.isdir("/dev/shm") else "/tmp/cta-display.recent.log",
+)
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted lines in memory."""
+    
+    def __init__(self, capacity: int = 500):
+        super().__init__()
+        self._lines: Deque[str] = collections.deque(maxlen=capacity)
+        # Bumped on every new line, so publishers can skip unchanged buffers
+        self.version = 0
+        self.published_version = -1
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            self._lines.append(line)
+            self.version += 1
+    
+    def lines(self) -> List[str]:
+        with self.lock:
+            return list(self._lines)
+
+
+class DedupHandler(logging.Handler):
+    """
+    Decides once per record whether it is written, then fans out to targets.
+    
+    - The same message (logger, level, text) is let through at most once
+      per window_s; the next copy after the window carries
+      "[repeated N times]".
+    - At most max_per_minute records pass in total; what the limit drops is
+      reported as "[N other messages dropped by rate limit]" on the next one.
+    
+    During an outage an error repeated every poll therefore costs one line
+    per window, whatever the poll rate.
+    """
+    
+    # Forget messages not seen for this many windows (bounds the key table)
+    FORGET_WINDOWS = 4
+    
+    def __init__(
+        self,
+        targets: List[logging.Handler],
+        window_s: float = 300,
+        max_per_minute: int = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize dedup handler.
+        
+        Args:
+            targets: Handlers that receive the records let through
+            window_s: Minimum time between two copies of the same message
+            max_per_minute: Cap on records passed per minute, all messages together
+            clock: Monotonic time source
+        """
+        super().__init__()
+        self.targets = targets
+        self.window_s = window_s
+        self.max_per_minute = max_per_minute
+        self.clock = clock
+        
+        # key -> [last emitted at, copies suppressed since]
+        self._seen: Dict[Tuple[str, int, str], List] = {}
+        self._minute_start = clock()
+        self._minute_count = 0
+        self._rate_dropped = 0
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+        except Exception:
+            self.handleError(record)
+            return
+        key = (record.name, record.levelno, message)
+        now = self.clock()
+        
+        with self.lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window_s:
+                entry[1] += 1
+                return
+            
+            if now - self._minute_start >= 60:
+                self._minute_start = now
+                self._minute_count = 0
+            if self._minute_count >= self.max_per_minute:
+                self._rate_dropped += 1
+                return
+            self._minute_count += 1
+            
+            repeated = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            rate_dropped, self._rate_dropped = self._rate_dropped, 0
+            if len(self._seen) > 1000:
+                horizon = now - self.FORGET_WINDOWS * self.window_s
+                self._seen = {k: v for k, v in self._seen.items() if v[0] >= horizon}
+        
+        notes = []
+        if repeated:
+            notes.append(f"repeated {repeated} times")
+        if rate_dropped:
+            notes.append(f"{rate_dropped} other messages dropped by rate limit")
+        if notes:
+            # Annotate a copy; the caller's record is left alone
+            record = logging.makeLogRecord(record.__dict__)
+            record.msg = f"{message} [{'; '.join(notes)}]"
+            record.args = None
+        
+        for target in self.targets:
+            if record.levelno >= target.level:
+                target.handle(record)
+    
+    def close(self):
+        for target in self.targets:
+            target.close()
+        super().close()
+
+
+def setup_logging(
+    log_path: Optional[str] = None,
+    level: int = logging.INFO,
+    max_bytes: int = 1024 * 1024,
+    backups: int = 3,
+    ring_capacity: int = 500,
+    console: Optional[bool] = None,
+) -> RingBufferHandler:
+    """
+    Route the root logger through dedup/rate limiting to file, ring and console.
+    
+    Args:
+        log_path: Rotating log file (None: no file); at most (backups + 1) * max_bytes on disk
+        level: Root log level
+        max_bytes: Size at which the log file rotates
+        backups: Rotated files kept
+        ring_capacity: Recent lines kept in memory for dumping
+        console: Also log to stderr (default: only when stderr is a terminal)
+    
+    Returns:
+        The ring buffer handler (see publish_ring / RingBufferHandler.lines)
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    targets: List[logging.Handler] = []
+    
+    ring = RingBufferHandler(ring_capacity)
+    targets.append(ring)
+    
+    if log_path:
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        targets.append(logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        ))
+    
+    if console is None:
+        console = sys.stderr.isatty()
+    if console:
+        targets.append(logging.StreamHandler())
+    
+    for target in targets:
+        target.setFormatter(formatter)
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DedupHandler(targets))
+    root.setLevel(level)
+    
+    # Crashes end up in the same bounded log
+    def log_uncaught(exc_type, exc, tb):
+        logging.getLogger("uncaught").critical("Uncaught exception", exc_info=(exc_type, exc, tb))
+    
+    sys.excepthook = log_uncaught
+    threading.excepthook = lambda args: log_uncaught(args.exc_type, args.exc_value, args.exc_traceback)
+    return ring
+
+
+def publish_ring(ring: RingBufferHandler, path: str = DISPLAY_RING_PATH):
+    """Atomically write the ring buffer to a file if it changed since the last publish."""
+    version = ring.version
+    if version == ring.published_version:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write("\n".join(ring.lines()) + "\n")
+    os.replace(tmp, path)
+    ring.published_version = version
+
+
+def read_ring(path: str = DISPLAY_RING_PATH) -> Optional[str]:
+    """Contents of a published ring buffer, or None if there is none."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
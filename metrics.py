@@ -0,0 +1,184 @@
+"""
+Lightweight performance metrics with Prometheus text-format export
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Where the display process publishes its metrics for photo_backend to serve.
+# /dev/shm is RAM-backed, so frequent publishing never touches the SD card.
+DISPLAY_METRICS_PATH = os.environ.get(
+    "METRICS_PATH",
+    "/dev/shm/cta-display.prom" if os.path.isdir("/dev/shm") else "/tmp/cta-display.prom",
+)
+
+# Seconds, tuned for the range between a frame (~ms) and an API timeout (10 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+class Counter:
+    """Monotonic count, optionally split by labels."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self, name: str) -> List[str]:
+        with self._lock:
+            items = list(self._values.items()) or [((), 0)]
+        return [f"{name}{_format_labels(k)} {v}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. a timestamp)."""
+    
+    kind = "gauge"
+    
+    def set(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed durations."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+    
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall time of a with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+    
+    def samples(self, name: str) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{name}_sum {total}")
+        lines.append(f"{name}_count {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, cls, name: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            return metric
+    
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter, name, help_text)
+    
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge, name, help_text)
+    
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, buckets)
+    
+    def render(self, prefix: str = "") -> str:
+        """
+        All metrics in Prometheus text exposition format.
+        
+        Args:
+            prefix: Prepended to every metric name, so the display's and the
+                backend's copies of shared metrics stay distinct when served together
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            name = prefix + metric.name
+            lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples(name))
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry; each process (display, backend) exports its own
+REGISTRY = Registry()
+
+# Name prefixes for each process's metrics
+DISPLAY_PREFIX = "cta_display_"
+BACKEND_PREFIX = "cta_backend_"
+
+
+def publish(path: str = DISPLAY_METRICS_PATH, registry: Registry = REGISTRY, prefix: str = DISPLAY_PREFIX):
+    """Atomically write the registry to a file (textfile-collector style)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render(prefix))
+    os.replace(tmp, path)
+
+
+def read_published(path: str = DISPLAY_METRICS_PATH) -> Optional[str]:
+    """Contents of a published metrics file, or None if there is none."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_sample(text: str, name: str) -> Optional[float]:
+    """Value of an unlabelled sample in Prometheus text, or None."""
+    prefix = name + " "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            try:
+                return float(line[len(prefix):])
+            except ValueError:
+                return None
+    return None
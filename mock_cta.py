@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the CTA Train Tracker ttarrivals API
+
+Replays recorded ctatt payloads (fixtures/ttarrivals by default) with
+their timestamps shifted to the present, and can inject the failures
+the display has to survive: slow responses, timeouts, HTTP 5xx,
+truncated JSON and Train Tracker error codes. In --record mode it
+proxies to the live API instead and saves every response as a fixture.
+
+Point the display at it with:
+    CTA_BASE_URL=http://localhost:5002/api/1.0/ttarrivals.aspx python3 cta-display.py
+
+Usage:
+    python3 mock_cta.py [--port 5002] [--fixtures fixtures/ttarrivals]
+    python3 mock_cta.py --latency-ms 800 --jitter-ms 400 --error-rate 0.2 --seed 1
+    python3 mock_cta.py --record fixtures/recorded
+
+Fault rates can also be changed while it runs:
+    curl -X POST localhost:5002/_mock/faults -H 'Content-Type: application/json' -d '{"timeout_rate": 1}'
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from flask import Flask, Response, jsonify, request
+
+import cta_time
+from cta_api import DEFAULT_BASE_URL
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BASE_DIR, "fixtures", "ttarrivals")
+ENDPOINT = "/api/1.0/ttarrivals.aspx"
+
+# Timestamp fields in a ctatt payload, shifted together on replay
+TIME_FIELDS = ("prdt", "arrT")
+
+
+class Faults:
+    """Failure rates (0-1, checked in declaration order) and latency settings."""
+    
+    RATES = ("timeout_rate", "error_rate", "malformed_rate", "api_error_rate")
+    
+    def __init__(self, **settings):
+        self.latency_ms = 0.0          # added to every response
+        self.jitter_ms = 0.0           # plus uniform 0..jitter_ms
+        self.timeout_rate = 0.0        # hang for timeout_s, then drop the response
+        self.timeout_s = 30.0          # longer than CTAClient's 10 s timeout
+        self.error_rate = 0.0          # HTTP error_status with an HTML body
+        self.error_status = 503
+        self.malformed_rate = 0.0      # valid response truncated mid-JSON
+        self.api_error_rate = 0.0      # HTTP 200 with a non-zero errCd
+        self.api_error_code = "102"
+        self.api_error_name = "Max daily usage exceeded."
+        self._lock = threading.Lock()
+        self.update(settings)
+    
+    def update(self, settings: Dict):
+        """Apply a dict of settings; unknown keys raise KeyError."""
+        with self._lock:
+            for key, value in settings.items():
+                if key.startswith("_") or not hasattr(self, key):
+                    raise KeyError(key)
+                setattr(self, key, type(getattr(self, key))(value))
+    
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+    
+    def pick(self, rng: random.Random) -> Tuple[float, Optional[str]]:
+        """
+        Decide how to answer one request.
+        
+        Returns:
+            Tuple of (delay in seconds, fault name or None for a normal response)
+        """
+        with self._lock:
+            delay = (self.latency_ms + rng.uniform(0, self.jitter_ms)) / 1000
+            roll = rng.random()
+            for name in self.RATES:
+                rate = getattr(self, name)
+                if roll < rate:
+                    return delay, name[:-len("_rate")]
+                roll -= rate
+        return delay, None
+
+
+def shift_times(payload: Dict, now: datetime) -> Dict:
+    """Copy of a ctatt payload with every timestamp moved so tmst == now."""
+    ctatt = payload["ctatt"]
+    offset = now - datetime.fromisoformat(ctatt["tmst"])
+    
+    def shift(value: str) -> str:
+        return (datetime.fromisoformat(value) + offset).isoformat(timespec="seconds")
+    
+    etas = [
+        {**eta, **{field: shift(eta[field]) for field in TIME_FIELDS if eta.get(field)}}
+        for eta in ctatt.get("eta", [])
+    ]
+    return {"ctatt": {**ctatt, "tmst": shift(ctatt["tmst"]), "eta": etas}}
+
+
+def api_error(code: str, name: str) -> Dict:
+    """A Train Tracker error response body."""
+    return {"ctatt": {"tmst": cta_time.now().replace(tzinfo=None).isoformat(timespec="seconds"), "errCd": code, "errNm": name}}
+
+
+class FixtureLibrary:
+    """
+    Recorded payloads indexed by the station (mapid) and stops (stpid) they cover.
+    
+    Several recordings of one station are replayed in file-name order and
+    then loop, so a recorded session plays back as it happened.
+    """
+    
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        self._payloads: Dict[Tuple[str, str], List[Dict]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.reload()
+    
+    def reload(self):
+        """(Re)read every *.json payload in the fixture directory."""
+        payloads: Dict[Tuple[str, str], List[Dict]] = {}
+        for path in sorted(glob.glob(os.path.join(self.fixture_dir, "*.json"))):
+            try:
+                with open(path) as f:
+                    payload = json.load(f)
+                etas = payload["ctatt"].get("eta", [])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Skipping fixture {path}: {e}")
+                continue
+            
+            for station in {str(eta.get("staId")) for eta in etas}:
+                payloads.setdefault(("mapid", station), []).append(payload)
+            for stop in {str(eta.get("stpId")) for eta in etas}:
+                stop_etas = [eta for eta in etas if str(eta.get("stpId")) == stop]
+                stop_payload = {"ctatt": {**payload["ctatt"], "eta": stop_etas}}
+                payloads.setdefault(("stpid", stop), []).append(stop_payload)
+        
+        with self._lock:
+            self._payloads = payloads
+            self._cursor = {}
+    
+    def next_payload(self, param: str, value: str) -> Optional[Dict]:
+        """Next recorded payload for a mapid/stpid, or None if none was recorded."""
+        key = (param, value)
+        with self._lock:
+            recordings = self._payloads.get(key)
+            if not recordings:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = (i + 1) % len(recordings)
+            return recordings[i]
+
+
+class Recorder:
+    """Forwards requests to the live API and saves each JSON response as a fixture."""
+    
+    def __init__(self, upstream: str, out_dir: str):
+        self.upstream = upstream
+        self.out_dir = out_dir
+        self.session = requests.Session()
+        os.makedirs(out_dir, exist_ok=True)
+    
+    def forward(self, params: Dict[str, str]) -> Tuple[bytes, int, str]:
+        """
+        Perform the live request.
+        
+        Returns:
+            Tuple of (body, HTTP status, content type)
+        """
+        r = self.session.get(self.upstream, params=params, timeout=10)
+        if r.ok and params.get("outputType", "").upper() == "JSON":
+            self._save(params, r.content)
+        return r.content, r.status_code, r.headers.get("Content-Type", "application/json")
+    
+    def _save(self, params: Dict[str, str], body: bytes):
+        try:
+            tmst = json.loads(body)["ctatt"]["tmst"]
+        except (ValueError, KeyError, TypeError):
+            return
+        param = "mapid" if "mapid" in params else "stpid"
+        # Sortable names, so FixtureLibrary replays a session in recording order
+        name = f"{param}-{params.get(param)}-{tmst.replace('-', '').replace(':', '')}.json"
+        path = os.path.join(self.out_dir, name)
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        print(f"Recorded {name}")
+
+
+# === APP ===
+
+app = Flask(__name__)
+faults = Faults()
+rng = random.Random()
+library: Optional[FixtureLibrary] = None
+recorder: Optional[Recorder] = None
+api_key: Optional[str] = None  # when set, other keys get errCd 101
+
+
+@app.route(ENDPOINT, methods=["GET"])
+def ttarrivals():
+    delay, fault = faults.pick(rng)
+    if delay:
+        time.sleep(delay)
+    
+    if fault == "timeout":
+        settings = faults.as_dict()
+        time.sleep(settings["timeout_s"])
+        return Response("", status=504)
+    if fault == "error":
+        status = faults.as_dict()["error_status"]
+        return Response(f"<html><body><h1>{status} Server Error</h1></body></html>", status=status, mimetype="text/html")
+    if fault == "api_error":
+        settings = faults.as_dict()
+        return jsonify(api_error(settings["api_error_code"], settings["api_error_name"]))
+    
+    if recorder is not None:
+        try:
+            body, status, content_type = recorder.forward(request.args.to_dict())
+        except requests.RequestException as e:
+            return Response(f"Upstream error: {e}", status=502, mimetype="text/plain")
+    else:
+        body, status, content_type = replay(request.args), 200, "application/json"
+    
+    if fault == "malformed":
+        body = body[:len(body) // 2]
+    return Response(body, status=status, content_type=content_type)
+
+
+def replay(args) -> bytes:
+    """Body for a request answered from the fixture library."""
+    if api_key and args.get("key") != api_key:
+        return json.dumps(api_error("101", "Invalid API key.")).encode()
+    
+    param = "mapid" if "mapid" in args else "stpid" if "stpid" in args else None
+    if param is None:
+        return json.dumps(api_error("100", "Required parameter 'mapid' or 'stpid' is missing.")).encode()
+    
+    payload = library.next_payload(param, args[param])
+    if payload is None:
+        return json.dumps(api_error("103", f"No fixture recorded for {param} {args[param]}.")).encode()
+    
+    now = cta_time.now().replace(tzinfo=None)
+    return json.dumps(shift_times(payload, now)).encode()
+
+
+@app.route("/_mock/faults", methods=["GET", "POST"])
+def mock_faults():
+    """Read or change fault settings at runtime (POST a JSON object of settings)."""
+    if request.method == "POST":
+        try:
+            faults.update(request.get_json(force=True) or {})
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid setting: {e}"}), 400
+    return jsonify(faults.as_dict())
+
+
+@app.route("/_mock/reload", methods=["POST"])
+def mock_reload():
+    """Re-read the fixture directory (e.g. after recording)."""
+    if library is not None:
+        library.reload()
+    return jsonify({"success": True})
+
+
+def main():
+    global library, recorder, api_key
+    
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5002)
+    ap.add_argument("--fixtures", default=FIXTURE_DIR, help="directory of recorded ctatt JSON payloads to replay")
+    ap.add_argument("--record", metavar="DIR", help="proxy to the live API and save responses into DIR")
+    ap.add_argument("--upstream", default=DEFAULT_BASE_URL, help="live endpoint used by --record")
+    ap.add_argument("--key", help="only accept this API key (others get errCd 101)")
+    ap.add_argument("--seed", type=int, help="seed fault/latency randomness for reproducible runs")
+    ap.add_argument("--latency-ms", type=float, default=0, help="delay added to every response")
+    ap.add_argument("--jitter-ms", type=float, default=0, help="extra random delay, 0..N ms")
+    ap.add_argument("--timeout-rate", type=float, default=0, help="fraction of requests that hang for --timeout-s")
+    ap.add_argument("--timeout-s", type=float, default=30, help="how long a timed-out request hangs")
+    ap.add_argument("--error-rate", type=float, default=0, help="fraction answered with HTTP --error-status")
+    ap.add_argument("--error-status", type=int, default=503)
+    ap.add_argument("--malformed-rate", type=float, default=0, help="fraction answered with truncated JSON")
+    ap.add_argument("--api-error-rate", type=float, default=0, help="fraction answered with a Train Tracker errCd")
+    ap.add_argument("--api-error-code", default="102")
+    args = ap.parse_args()
+    
+    faults.update({
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "timeout_rate": args.timeout_rate,
+        "timeout_s": args.timeout_s,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "malformed_rate": args.malformed_rate,
+        "api_error_rate": args.api_error_rate,
+        "api_error_code": args.api_error_code,
+    })
+    if args.seed is not None:
+        rng.seed(args.seed)
+    api_key = args.key
+    
+    if args.record:
+        recorder = Recorder(args.upstream, args.record)
+        print(f"Recording {args.upstream} into {args.record}")
+    else:
+        library = FixtureLibrary(args.fixtures)
+        print(f"Replaying fixtures from {args.fixtures}")
+    
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,52 @@
 #!/usr/bin/env python3
+import fcntl
+import logging
 import os
+import secrets
 import shutil
-from datetime import datetime
-from flask import Flask, request, render_template, abort, send_from_directory, jsonify
-from werkzeug.utils import secure_filename
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Request, Response, request, render_template, abort, send_file, send_from_directory, jsonify, url_for
+from PIL import Image, ImageOps, UnidentifiedImageError
 from dotenv import load_dotenv
 
+import log_utils
+import metrics
+from image_utils import build_background_derivative, derivative_paths, library_photos, read_derivative_sidecar
+from thumbnails import ThumbnailCache
+
+# HEIC decoding is optional (pip install pillow-heif)
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIC_SUPPORTED = True
+except ImportError:
+    HEIC_SUPPORTED = False
+
+
+class SpoolToDiskRequest(Request):
+    """Request that streams uploaded files straight into INCOMING_DIR."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Werkzeug writes the multipart body into this file chunk by chunk while
+        # enforcing MAX_CONTENT_LENGTH, so an upload is never held in memory and
+        # is written to the SD card exactly once.
+        os.makedirs(INCOMING_DIR, exist_ok=True)
+        spool = tempfile.NamedTemporaryFile("w+b", dir=INCOMING_DIR, prefix="upload-", delete=False)
+        self.__dict__.setdefault("spooled_paths", []).append(spool.name)
+        return spool
+
+    def close(self):
+        # Anything not moved into place by ingest_upload is discarded with the request
+        super().close()
+        for path in self.__dict__.get("spooled_paths", ()):
+            remove_quietly(path)
+
+
 app = Flask(__name__)
+app.request_class = SpoolToDiskRequest
 app.config["MAX_CONTENT_LENGTH"] = 20 * 1024 * 1024  # 20MB max upload
 
 # === CONFIG ===
@@ -22,14 +62,256 @@ if not token:
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BG_PATH = os.path.join(BASE_DIR, "background", "current.jpg")
 DEFAULT_IMAGE_PATH = os.path.join(BASE_DIR, "images", "default.jpg")
+# Pre-built screen-sized derivative of the default image (default.ppm/.json)
+DEFAULT_DERIVATIVE_PATH = os.path.join(BASE_DIR, "background", "default.jpg")
+# Every upload is kept here (with its derivative) for the display's slideshow
+LIBRARY_DIR = os.path.join(BASE_DIR, "background", "library")
+MAX_LIBRARY_PHOTOS = int(os.environ.get("LIBRARY_SIZE", "50"))
+# Uploads are spooled here (same filesystem as BG_PATH, so the final move is a rename)
+INCOMING_DIR = os.path.join(BASE_DIR, "background", "incoming")
+# Held while writing to the library or current.*, so several server workers
+# (gunicorn.conf.py) still apply uploads and resets one at a time
+INGEST_LOCK_PATH = os.path.join(BASE_DIR, "background", ".ingest.lock")
+# Thumbnails of current/library photos, named by content hash
+THUMBNAIL_DIR = os.path.join(BASE_DIR, "background", "thumbnails")
+THUMBNAIL_SIZES = (160, 320, 640)  # longest edge; anything else is refused
+DEFAULT_THUMBNAIL_SIZE = 320
+# Static page assets (images/) may be reused without revalidation for this long
+STATIC_MAX_AGE_S = 24 * 3600
+# Rotated at 1 MB with 3 backups; the last lines are also kept in RAM for /logs
+LOG_PATH = os.path.join(BASE_DIR, "photo_backend.log")
+
+# Derivatives are rendered at the display's resolution (7" Pi screen by default)
+SCREEN_W = int(os.environ.get("SCREEN_WIDTH", "800"))
+SCREEN_H = int(os.environ.get("SCREEN_HEIGHT", "480"))
 
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp", "HEIC", "heic"}
 
+# Non-JPEG uploads are re-encoded as JPEG no larger than this on the long edge
+MAX_STORED_EDGE = 4096
+# Refuse to decode anything bigger (~100 MP) so one photo can't exhaust the Pi's RAM
+Image.MAX_IMAGE_PIXELS = 100_000_000
+
+# Uploads beyond this many queued/in-flight are turned away with 503
+MAX_PENDING_UPLOADS = 4
+
+# All writes to BG_PATH go through this single worker, so concurrent uploads
+# (and resets) are applied one at a time in arrival order
+ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+ingest_slots = threading.BoundedSemaphore(MAX_PENDING_UPLOADS)
+
+thumbnail_cache = ThumbnailCache(THUMBNAIL_DIR)
+
+# /health reports the display as stale once its heartbeat is older than this
+DISPLAY_STALE_S = float(os.environ.get("DISPLAY_STALE_SECONDS", "120"))
+
+UPLOADS = metrics.REGISTRY.counter("uploads_total", "Upload attempts by result")
+INGEST_TIME = metrics.REGISTRY.histogram("upload_ingest_seconds", "Upload normalize, derivative and install time")
+
+log_ring = log_utils.setup_logging(LOG_PATH)
+# One access log line per /health probe would dominate the log file
+logging.getLogger("werkzeug").setLevel(logging.WARNING)
+logger = logging.getLogger("photo_backend")
+
 # === HELPERS ===
 
 def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
+
+def sniff_image_format(header: bytes):
+    """
+    Identify an image from its first bytes.
+    
+    Returns:
+        "jpeg", "png", "gif", "webp" or "heic", or None if unrecognized
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[4:8] == b"ftyp" and header[8:12] in (b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1"):
+        return "heic"
+    return None
+
+
+def remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def normalize_to_jpeg(src_path: str, dst_path: str):
+    """Re-encode PNG/GIF/WebP/HEIC as an upright, size-capped JPEG."""
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((MAX_STORED_EDGE, MAX_STORED_EDGE))
+        img.convert("RGB").save(dst_path, "JPEG", quality=90)
+
+
+def ingest_upload(spool_path: str, fmt: str):
+    """
+    Add a spooled upload to the library and make it the live background
+    (runs on ingest_executor).
+    
+    Raises:
+        UnidentifiedImageError, OSError: If the file does not decode
+    """
+    if fmt == "jpeg":
+        src_path = spool_path
+    else:
+        src_path = spool_path + ".jpg"
+        normalize_to_jpeg(spool_path, src_path)
+    
+    # Timestamp first so library_photos() sorts oldest to newest
+    name = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{secrets.token_hex(4)}.jpg"
+    library_path = os.path.join(LIBRARY_DIR, name)
+    os.makedirs(LIBRARY_DIR, exist_ok=True)
+    
+    try:
+        # Render the screen-sized derivative up front so the display never
+        # decodes the original. This is also the full decode that proves the
+        # upload is a usable image.
+        try:
+            build_background_derivative(src_path, library_path, SCREEN_W, SCREEN_H)
+        except Exception:
+            discard_derivative(library_path)
+            raise
+        os.replace(src_path, library_path)
+    finally:
+        if src_path != spool_path:
+            remove_quietly(src_path)
+    
+    install_background(library_path)
+    prune_library()
+
+
+def prune_library():
+    """Drop the oldest library photos beyond MAX_LIBRARY_PHOTOS."""
+    photos = library_photos(LIBRARY_DIR)
+    for path in photos[:max(0, len(photos) - MAX_LIBRARY_PHOTOS)]:
+        discard_derivative(path)
+        remove_quietly(path)
+
+
+def link_replace(src: str, dst: str):
+    """Atomically point dst at src's contents (hard link, copy as fallback)."""
+    tmp = f"{dst}.tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def discard_derivative(image_path: str):
+    """Remove a derivative so the display never pairs it with the wrong image."""
+    for path in derivative_paths(image_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def ensure_default_derivative():
+    """Build the default image's derivative once (rebuilt if stale or for another screen)."""
+    if read_derivative_sidecar(DEFAULT_IMAGE_PATH, SCREEN_W, SCREEN_H, DEFAULT_DERIVATIVE_PATH) is not None:
+        return
+    os.makedirs(os.path.dirname(DEFAULT_DERIVATIVE_PATH), exist_ok=True)
+    build_background_derivative(DEFAULT_IMAGE_PATH, DEFAULT_DERIVATIVE_PATH, SCREEN_W, SCREEN_H)
+
+
+def install_background(image_path: str, derivative_for: str = None):
+    """
+    Point current.* at an image and its derivative without copying.
+    
+    The image is linked last: that rename is what wakes the display, and
+    by then the matching derivative is already in place.
+    """
+    for src, dst in zip(derivative_paths(derivative_for or image_path), derivative_paths(BG_PATH)):
+        link_replace(src, dst)
+    link_replace(image_path, BG_PATH)
+
+
+def install_default_background():
+    """Point current.* at the default image and its derivative (runs on ingest_executor)."""
+    ensure_default_derivative()
+    install_background(DEFAULT_IMAGE_PATH, DEFAULT_DERIVATIVE_PATH)
+
+
+def with_ingest_lock(fn, *args):
+    """Run fn(*args) holding the ingest lock shared by all server processes."""
+    os.makedirs(os.path.dirname(INGEST_LOCK_PATH), exist_ok=True)
+    with open(INGEST_LOCK_PATH, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return fn(*args)
+
+
+def prepare_storage():
+    """Startup housekeeping (once per server, before any request is served)."""
+    # Drop spool files left behind by a crash or an aborted request
+    if os.path.isdir(INCOMING_DIR):
+        for name in os.listdir(INCOMING_DIR):
+            remove_quietly(os.path.join(INCOMING_DIR, name))
+    if os.path.exists(DEFAULT_IMAGE_PATH):
+        try:
+            ensure_default_derivative()
+        except Exception as e:
+            logger.error("Error building default background derivative: %s", e)
+
+
+def upload_page(status: int = 200):
+    """The upload UI, with a preview of the current background."""
+    body = render_template(
+        "upload.html",
+        current_thumbnail_url=url_for("current_thumbnail", secret=token),
+    )
+    return body, status
+
+
+def send_thumbnail(image_path: str, immutable: bool):
+    """
+    Thumbnail response for an image, answering conditional GETs with 304.
+    
+    Args:
+        image_path: Source photo
+        immutable: The URL always names the same photo (library), so clients
+            may keep it for good; otherwise they revalidate every time
+    """
+    size = request.args.get("size", DEFAULT_THUMBNAIL_SIZE, type=int)
+    if size not in THUMBNAIL_SIZES:
+        abort(400)
+    
+    try:
+        thumbnail = thumbnail_cache.get(image_path, size)
+    except OSError as e:
+        logger.error("Error rendering thumbnail for %s: %s", image_path, e)
+        abort(500)
+    if thumbnail is None:
+        abort(404)
+    
+    response = send_file(
+        thumbnail.path,
+        mimetype="image/jpeg",
+        etag=thumbnail.etag,
+        max_age=365 * 24 * 3600 if immutable else 0,
+        conditional=True,
+    )
+    # Behind a secret URL: browsers may cache it, shared caches (the tunnel) may not
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
 # === ROUTES ===
 
 @app.route("/upload/<secret>", methods=["GET", "POST"])
@@ -39,29 +321,45 @@ def upload(secret: str):
         abort(404)
 
     if request.method == "GET":
-        return render_template("upload.html")
+        return upload_page()
 
     # POST: process upload
     if "photo" not in request.files:
-        return render_template("upload.html"), 400
+        UPLOADS.inc(result="bad_request")
+        return upload_page(400)
 
     file = request.files["photo"]
     if file.filename == "":
-        return render_template("upload.html"), 400
+        UPLOADS.inc(result="bad_request")
+        return upload_page(400)
 
     if not allowed_file(file.filename):
-        return render_template("upload.html"), 400
+        UPLOADS.inc(result="bad_request")
+        return upload_page(400)
 
-    os.makedirs(os.path.dirname(BG_PATH), exist_ok=True)
+    # Already spooled to disk by SpoolToDiskRequest; check the header before
+    # accepting anything into the pipeline
+    fmt = sniff_image_format(file.stream.read(16))
+    file.stream.close()
+    if fmt is None or (fmt == "heic" and not HEIC_SUPPORTED):
+        UPLOADS.inc(result="unsupported")
+        return upload_page(415)
 
-    safe_name = secure_filename(file.filename)
-    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    tmp_path = os.path.join(os.path.dirname(BG_PATH), f"tmp-{ts}-{safe_name}")
-
-    file.save(tmp_path)
-    os.replace(tmp_path, BG_PATH)  # overwrite any existing background
+    if not ingest_slots.acquire(blocking=False):
+        UPLOADS.inc(result="busy")
+        return upload_page(503)
+    try:
+        with INGEST_TIME.time():
+            ingest_executor.submit(with_ingest_lock, ingest_upload, file.stream.name, fmt).result()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logger.warning("Rejected upload: %s", e)
+        UPLOADS.inc(result="rejected")
+        return upload_page(415)
+    finally:
+        ingest_slots.release()
 
-    return render_template("upload.html")
+    UPLOADS.inc(result="accepted")
+    return upload_page()
 
 
 @app.route("/reset/<secret>", methods=["POST"])
@@ -79,22 +377,76 @@ def reset_to_default(secret: str):
         # Create background directory if it doesn't exist
         os.makedirs(os.path.dirname(BG_PATH), exist_ok=True)
 
-        # Copy default image to background
-        shutil.copy2(DEFAULT_IMAGE_PATH, BG_PATH)
+        # Point current.* at the pre-built default derivative (no copy, no decode),
+        # queued behind any uploads in flight
+        ingest_executor.submit(with_ingest_lock, install_default_background).result()
 
         return jsonify({"success": True, "message": "Background reset to default"}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+def display_status() -> dict:
+    """Liveness of the display loop, from the heartbeat in its published metrics."""
+    published = metrics.read_published()
+    last_update = None if published is None else metrics.read_sample(published, metrics.DISPLAY_PREFIX + "last_update_timestamp_seconds")
+    if last_update is None:
+        return {"status": "unknown", "seconds_since_update": None}
+
+    age = max(0.0, time.time() - last_update)
+    return {
+        "status": "ok" if age <= DISPLAY_STALE_S else "stale",
+        "seconds_since_update": round(age, 1),
+    }
+
 @app.route("/health", methods=["GET"])
 def health():
-    return {"status": "ok"}, 200
+    # Always 200 while the backend is up (check-tunnel.sh keys off that);
+    # a frozen display shows up in the body instead
+    return {"status": "ok", "display": display_status()}, 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus scrape target: backend metrics plus the display's last publish."""
+    body = metrics.REGISTRY.render(metrics.BACKEND_PREFIX) + (metrics.read_published() or "")
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@app.route("/logs/<secret>", methods=["GET"])
+def logs(secret: str):
+    """Recent log lines of the backend and of the display (from RAM, no disk reads)."""
+    # Wrong token? Pretend this doesn't exist.
+    if secret != token:
+        abort(404)
+
+    backend_lines = "\n".join(log_ring.lines())
+    display_lines = log_utils.read_ring() or "(display has not published any log lines)\n"
+    body = f"=== photo_backend ===\n{backend_lines}\n\n=== cta-display ===\n{display_lines}"
+    return Response(body, mimetype="text/plain")
+
+@app.route("/thumbnails/<secret>/current.jpg", methods=["GET"])
+def current_thumbnail(secret: str):
+    """Thumbnail of the live background (?size=160|320|640)."""
+    # Wrong token? Pretend this doesn't exist.
+    if secret != token:
+        abort(404)
+    return send_thumbnail(BG_PATH, immutable=False)
+
+@app.route("/thumbnails/<secret>/library/<name>", methods=["GET"])
+def library_thumbnail(secret: str, name: str):
+    """Thumbnail of a library photo (names never get reused, so it is cached for good)."""
+    # Wrong token? Pretend this doesn't exist.
+    if secret != token:
+        abort(404)
+    if name.startswith(".") or not name.lower().endswith(".jpg"):
+        abort(404)
+    return send_thumbnail(os.path.join(LIBRARY_DIR, name), immutable=True)
 
 @app.route("/images/<path:filename>")
 def serve_image(filename):
-    """Serve images from the images directory"""
+    """Serve images from the images directory (ETag + Last-Modified, 304 when unchanged)"""
     images_dir = os.path.join(BASE_DIR, "images")
-    return send_from_directory(images_dir, filename)
+    return send_from_directory(images_dir, filename, max_age=STATIC_MAX_AGE_S)
 
 if __name__ == "__main__":
+    # Development server; in production run `gunicorn photo_backend:app` (gunicorn.conf.py)
+    prepare_storage()
     app.run(host="0.0.0.0", port=5001)
\ No newline at end of file
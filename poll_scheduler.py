@@ -0,0 +1,126 @@
+"""
+Adaptive, quota-aware scheduling of Train Tracker polls
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import cta_time
+from metrics import REGISTRY
+
+POLL_INTERVAL = REGISTRY.gauge("poll_interval_seconds", "Delay chosen until the next Train Tracker poll")
+BUDGET_REMAINING = REGISTRY.gauge("api_budget_remaining", "Train Tracker requests left in today's budget")
+
+
+class PollScheduler:
+    """
+    Picks the delay before the next poll from the result of the last one.
+    
+    - Trains present: poll about POLLS_PER_GAP times before the nearest one
+      arrives, clamped to [near_s, far_s], so a train 1 minute out is polled
+      every near_s while one 20 minutes out is polled every far_s.
+    - No trains (no service, e.g. overnight): poll every idle_s.
+    - Failed poll: exponential backoff with jitter, from backoff_base_s up
+      to backoff_max_s, reset by the next success.
+    - Daily budget: requests are counted per Chicago calendar day and the
+      delay never drops below what spreads the remaining budget evenly over
+      the rest of the day; once spent, polling resumes at midnight.
+    """
+    
+    # Polls wanted between now and the nearest arrival
+    POLLS_PER_GAP = 4
+    
+    def __init__(
+        self,
+        near_s: float = 15,
+        far_s: float = 90,
+        idle_s: float = 300,
+        backoff_base_s: float = 30,
+        backoff_max_s: float = 600,
+        daily_budget: int = 100_000,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], datetime] = cta_time.now,
+    ):
+        """
+        Initialize poll scheduler.
+        
+        Args:
+            near_s: Shortest delay (train about to arrive)
+            far_s: Longest delay while trains are predicted
+            idle_s: Delay when the stop has no predictions
+            backoff_base_s: Delay after the first failure (doubles per failure)
+            backoff_max_s: Cap on the failure backoff
+            daily_budget: Requests this display may make per day (CTA key quota)
+            rng: Random source for jitter (seed it for reproducible schedules)
+            clock: Returns the current time; the budget resets at its midnight
+        """
+        self.near_s = near_s
+        self.far_s = far_s
+        self.idle_s = idle_s
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.daily_budget = daily_budget
+        self.rng = rng or random.Random()
+        self.clock = clock
+        
+        self.failures = 0
+        self.requests_today = 0
+        self._day = clock().date()
+    
+    def next_delay(self, trains: Optional[List[Dict]], requests: int = 1) -> float:
+        """
+        Record a finished poll and choose the delay before the next one.
+        
+        Args:
+            trains: The poll's train dicts (with "minutes"), or None if it failed
+            requests: HTTP requests the poll made
+        
+        Returns:
+            Seconds to wait before polling again
+        """
+        now = self.clock()
+        self._count_requests(now, requests)
+        
+        if trains is None:
+            self.failures += 1
+            delay = self._backoff_delay()
+        else:
+            self.failures = 0
+            delay = self._arrivals_delay(trains)
+        
+        delay = max(delay, self._budget_floor(now))
+        POLL_INTERVAL.set(round(delay, 1))
+        return delay
+    
+    def remaining_budget(self) -> int:
+        return max(0, self.daily_budget - self.requests_today)
+    
+    def _arrivals_delay(self, trains: List[Dict]) -> float:
+        if not trains:
+            return self.idle_s
+        nearest_s = min(t["minutes"] for t in trains) * 60
+        return min(max(nearest_s / self.POLLS_PER_GAP, self.near_s), self.far_s)
+    
+    def _backoff_delay(self) -> float:
+        # Exponent clamped before the cap: a float base overflows at 2 ** 1024,
+        # which a days-long outage (e.g. an expired key) would reach
+        delay = min(self.backoff_base_s * 2 ** min(self.failures - 1, 32), self.backoff_max_s)
+        # "Equal jitter": at least half the backoff, so retries stay spread out
+        # without ever retrying immediately
+        return delay / 2 + self.rng.uniform(0, delay / 2)
+    
+    def _count_requests(self, now: datetime, requests: int):
+        if now.date() != self._day:
+            self._day = now.date()
+            self.requests_today = 0
+        self.requests_today += requests
+        BUDGET_REMAINING.set(self.remaining_budget())
+    
+    def _budget_floor(self, now: datetime) -> float:
+        """Smallest delay that keeps today's requests within the budget."""
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), now.tzinfo)
+        seconds_left = (midnight - now).total_seconds()
+        remaining = self.remaining_budget()
+        if remaining == 0:
+            return seconds_left
+        return seconds_left / remaining
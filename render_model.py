@@ -0,0 +1,212 @@
+"""
+View-model for the canvas text layer: arrivals -> text, applied by diffing
+
+Import-light (Tk only), so the display can paint before NumPy/Pillow load.
+"""
+import tkinter as tk
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+
+def format_minutes_text(minutes: int) -> str:
+    unit = "min" if minutes == 1 else "mins"
+    return f"{minutes} {unit} away"
+
+
+def format_age_text(age_s: float) -> str:
+    minutes = int(age_s // 60)
+    return f"updated {minutes} min ago" if minutes else f"updated {int(age_s)}s ago"
+
+
+def arrival_lines(trains: Optional[List[Dict]], stale_age_s: Optional[float] = None, destination: str = "Loop") -> Tuple[str, str]:
+    """
+    Primary and secondary line for one stop's arrivals.
+    
+    Args:
+        trains: Train dicts with "minutes", or None if there is no data
+        stale_age_s: Age of the data if it should carry an "updated ..." marker
+        destination: Shown in the no-service message
+    
+    Returns:
+        Tuple of (primary_text, secondary_text)
+    """
+    if trains is None:
+        primary_text, secondary_text = "--", "No Data"
+    elif not trains:
+        primary_text, secondary_text = "No trains", f"No service to {destination}"
+    else:
+        first = trains[0]
+        
+        if first["is_scheduled"] or first["is_delayed"]:
+            primary_text, secondary_text = "No trains", "Check service alerts"
+        else:
+            primary_text = format_minutes_text(first["minutes"])
+        
+        if len(trains) > 1:
+            second = trains[1]
+            if second["is_scheduled"]:
+                secondary_text = "No other train inbound"
+            else:
+                secondary_text = f"Next: {format_minutes_text(second['minutes'])}"
+        else:
+            secondary_text = "No additional trains"
+    
+    # Cached data older than a couple of polls gets an age marker
+    if trains is not None and stale_age_s is not None:
+        secondary_text = f"{secondary_text} · {format_age_text(stale_age_s)}"
+    
+    return primary_text, secondary_text
+
+
+def scheduled_lines(trains: List[Dict], destination: str = "Loop") -> Tuple[str, str]:
+    """
+    Primary and secondary line for timetable arrivals (no live data).
+    
+    Args:
+        trains: Train dicts with "minutes" from the offline schedule
+        destination: Shown in the no-service message
+    
+    Returns:
+        Tuple of (primary_text, secondary_text); the secondary line always
+        says the times are scheduled
+    """
+    if not trains:
+        return "No trains", f"No scheduled service to {destination}"
+    
+    primary_text = format_minutes_text(trains[0]["minutes"])
+    if len(trains) > 1:
+        secondary_text = f"Scheduled · Next: {format_minutes_text(trains[1]['minutes'])}"
+    else:
+        secondary_text = "Scheduled · no live data"
+    return primary_text, secondary_text
+
+
+class TextStyle(NamedTuple):
+    """Fill for one canvas text item, plus whether it needs a drop shadow."""
+    fill: str
+    shadow: bool
+    shadow_fill: str
+
+
+class TextState(NamedTuple):
+    """What one text item currently shows."""
+    text: str
+    fill: str
+    shadow: bool
+    shadow_fill: str
+
+
+class TextLayer:
+    """
+    Canvas text items (each with a drop shadow) updated by diffing.
+    
+    The on-screen state of every item is mirrored in Python, so setting
+    unchanged text costs no Tk calls at all. commit() pushes only the
+    texts that differ, and restyles (bbox + luminance lookup + fill) only
+    items whose text moved or whose background changed. Items are keyed
+    by any hashable, so extra rows for more stops add items, not
+    unconditional redraws.
+    """
+    
+    def __init__(self, canvas: tk.Canvas, shadow_offset: int = 2):
+        """
+        Initialize text layer.
+        
+        Args:
+            canvas: Canvas to draw on
+            shadow_offset: Drop shadow offset in pixels
+        """
+        self.canvas = canvas
+        self.shadow_offset = shadow_offset
+        
+        self._items: Dict[Hashable, Tuple[int, int]] = {}  # key -> (text id, shadow id)
+        self._shown: Dict[Hashable, TextState] = {}
+        self._wanted: Dict[Hashable, str] = {}
+        self._restyle: set = set()
+    
+    def add(self, key: Hashable, x: float, y: float, font, text: str = "", fill: str = "white") -> int:
+        """
+        Create a text item (shadow hidden until a style asks for it).
+        
+        Returns:
+            Canvas ID of the text item
+        """
+        shadow_id = self.canvas.create_text(
+            x + self.shadow_offset,
+            y + self.shadow_offset,
+            text=text,
+            font=font,
+            fill="black",
+            state="hidden",
+        )
+        item_id = self.canvas.create_text(x, y, text=text, font=font, fill=fill)
+        self._items[key] = (item_id, shadow_id)
+        self._shown[key] = TextState(text, fill, False, "black")
+        self._restyle.add(key)
+        return item_id
+    
+    def item_id(self, key: Hashable) -> int:
+        return self._items[key][0]
+    
+    def set_text(self, key: Hashable, text: str):
+        """Stage new text for an item (applied by commit())."""
+        self._wanted[key] = text
+    
+    def invalidate_styles(self):
+        """The background changed: every item needs restyling on the next commit()."""
+        self._restyle.update(self._items)
+    
+    def commit(self, style_fn: Callable[[Dict[Hashable, Tuple[float, float, float, float]]], Dict[Hashable, TextStyle]]) -> int:
+        """
+        Apply staged changes to the canvas.
+        
+        Args:
+            style_fn: Maps {key: bbox} to {key: TextStyle}
+                (e.g. BackgroundManager.text_styles); may return fewer keys
+                when no background is loaded yet
+        
+        Returns:
+            Number of canvas itemconfigure calls made
+        """
+        calls = 0
+        for key, text in self._wanted.items():
+            state = self._shown[key]
+            if text == state.text:
+                continue
+            item_id, shadow_id = self._items[key]
+            self.canvas.itemconfigure(item_id, text=text)
+            self.canvas.itemconfigure(shadow_id, text=text)
+            calls += 2
+            self._shown[key] = state._replace(text=text)
+            # Text extents moved, so the background under them did too
+            self._restyle.add(key)
+        self._wanted.clear()
+        
+        if not self._restyle:
+            return calls
+        
+        regions = {key: self.canvas.bbox(self._items[key][0]) for key in self._restyle}
+        self._restyle.clear()
+        for key, style in style_fn(regions).items():
+            calls += self._apply_style(key, style)
+        return calls
+    
+    def _apply_style(self, key: Hashable, style: TextStyle) -> int:
+        state = self._shown[key]
+        item_id, shadow_id = self._items[key]
+        calls = 0
+        
+        if style.fill != state.fill:
+            self.canvas.itemconfigure(item_id, fill=style.fill)
+            calls += 1
+        
+        shadow_changes = {}
+        if style.shadow != state.shadow:
+            shadow_changes["state"] = "normal" if style.shadow else "hidden"
+        if style.shadow_fill != state.shadow_fill:
+            shadow_changes["fill"] = style.shadow_fill
+        if shadow_changes:
+            self.canvas.itemconfigure(shadow_id, **shadow_changes)
+            calls += 1
+        
+        self._shown[key] = state._replace(fill=style.fill, shadow=style.shadow, shadow_fill=style.shadow_fill)
+        return calls
@@ -2,7 +2,6 @@
 set -e
 
 APP_DIR="/home/bilal/cta-display-rpi5"
-LOG_FILE="$APP_DIR/cta.log"
 
 export DISPLAY=:0
 export XAUTHORITY=/home/bilal/.Xauthority
@@ -44,7 +43,7 @@ xset s noblank 2>/dev/null || true
 
 cd "$APP_DIR"
 
-# Log and run
-echo "========================================" >> "$LOG_FILE"
-echo "[run-cta] Starting cta-display.py at $(date)" >> "$LOG_FILE"
-python3 cta-display.py 2>&1 | tee -a "$LOG_FILE"
\ No newline at end of file
+# cta-display.py writes its own size-capped, rotated cta.log; stdout/stderr
+# stay on the terminal (nothing unbounded is appended to the SD card)
+echo "[run-cta] Starting cta-display.py at $(date)"
+python3 cta-display.py
\ No newline at end of file
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Offline schedule fallback from a GTFS feed
+
+The CTA GTFS feed is expanded ahead of time into the scheduled arrivals at
+one stop/route/destination as a sorted array of Unix timestamps (4 bytes
+each), plus a JSON sidecar describing what it covers. Calendar exceptions,
+after-midnight trips (times past 24:00:00) and DST are resolved at build
+time, so at runtime the next departures are a binary search on a
+memory-mapped file: no network, no parsing, almost no RAM.
+
+Usage:
+    python3 schedule.py build google_transit.zip --stop 30254 --route Brn --destination loop
+    python3 schedule.py next schedule/30254-Brn-loop.bin
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import zipfile
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+import cta_time
+from arrivals import minutes_until
+
+INDEX_EXT = ".bin"
+SIDECAR_EXT = ".json"
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def index_path(directory: str, stop_id: str, route: str, destination: str) -> str:
+    """Where the index for one stop/route/destination lives."""
+    return os.path.join(directory, f"{stop_id}-{route}-{destination.lower()}{INDEX_EXT}")
+
+
+# === BUILD ===
+
+def read_table(feed_path: str, name: str) -> Iterator[Dict[str, str]]:
+    """Rows of one GTFS table from a feed zip or an unpacked feed directory."""
+    if os.path.isdir(feed_path):
+        path = os.path.join(feed_path, name)
+        if not os.path.exists(path):
+            return
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+        return
+    
+    with zipfile.ZipFile(feed_path) as feed:
+        if name not in feed.namelist():
+            return
+        with feed.open(name) as raw:
+            yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+
+
+def parse_gtfs_date(value: str) -> date:
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+def parse_gtfs_seconds(value: str) -> int:
+    """Seconds after service-day start for "H:MM:SS" (hours may exceed 23)."""
+    hours, minutes, seconds = (int(part) for part in value.strip().split(":"))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def service_dates(feed_path: str, service_ids: Set[str], start: date, days: int) -> Dict[str, List[date]]:
+    """
+    Dates in [start, start + days) on which each service runs.
+    
+    Applies calendar.txt weekday patterns and date ranges, then the
+    calendar_dates.txt additions (1) and removals (2).
+    """
+    end = start + timedelta(days=days)
+    dates: Dict[str, Set[date]] = {service_id: set() for service_id in service_ids}
+    
+    for row in read_table(feed_path, "calendar.txt"):
+        service_id = row["service_id"]
+        if service_id not in dates:
+            continue
+        first = max(parse_gtfs_date(row["start_date"]), start)
+        last = min(parse_gtfs_date(row["end_date"]), end - timedelta(days=1))
+        day = first
+        while day <= last:
+            if row[WEEKDAYS[day.weekday()]] == "1":
+                dates[service_id].add(day)
+            day += timedelta(days=1)
+    
+    for row in read_table(feed_path, "calendar_dates.txt"):
+        service_id = row["service_id"]
+        if service_id not in dates:
+            continue
+        day = parse_gtfs_date(row["date"])
+        if not start <= day < end:
+            continue
+        if row["exception_type"] == "1":
+            dates[service_id].add(day)
+        elif row["exception_type"] == "2":
+            dates[service_id].discard(day)
+    
+    return {service_id: sorted(running) for service_id, running in dates.items()}
+
+
+def service_day_start(day: date) -> float:
+    """
+    Unix time GTFS times on a service day count from.
+    
+    GTFS defines it as noon minus 12 hours, which is midnight except on
+    DST change days.
+    """
+    noon = datetime.combine(day, time(12), cta_time.CHICAGO)
+    return noon.timestamp() - 12 * 3600
+
+
+def build_index(
+    feed_path: str,
+    stop_id: str,
+    route: str,
+    destination: str,
+    out_path: str,
+    start: Optional[date] = None,
+    days: int = 60,
+) -> Dict:
+    """
+    Expand a GTFS feed into the scheduled arrivals at one stop.
+    
+    Writes <out stem>.bin (sorted little-endian uint32 Unix times) and
+    <out stem>.json, each via an atomic rename.
+    
+    Args:
+        feed_path: GTFS zip or directory (e.g. CTA's google_transit.zip)
+        stop_id: Platform stop ID (CTA's GTFS uses the Train Tracker stpid)
+        route: GTFS route_id (e.g. "Brn")
+        destination: Text the trip headsign must contain (e.g. "loop")
+        out_path: Index file path
+        start: First service day covered (default: today in Chicago)
+        days: Number of service days covered
+    
+    Returns:
+        The sidecar dict
+    """
+    if start is None:
+        start = cta_time.now().date()
+    
+    trips = {
+        row["trip_id"]: row["service_id"]
+        for row in read_table(feed_path, "trips.txt")
+        if row["route_id"] == route and destination.lower() in row.get("trip_headsign", "").lower()
+    }
+    
+    # stop_times.txt is by far the largest table: stream it, keep only this stop
+    stop_times = []
+    for row in read_table(feed_path, "stop_times.txt"):
+        if row["stop_id"] != stop_id or row["trip_id"] not in trips:
+            continue
+        value = row["arrival_time"] or row["departure_time"]
+        if value:
+            stop_times.append((trips[row["trip_id"]], parse_gtfs_seconds(value)))
+    
+    dates = service_dates(feed_path, set(trips.values()), start, days)
+    day_starts = {day: service_day_start(day) for running in dates.values() for day in running}
+    times = {
+        int(day_starts[day] + seconds)
+        for service_id, seconds in stop_times
+        for day in dates[service_id]
+    }
+    index = np.array(sorted(times), dtype="<u4")
+    
+    sidecar = {
+        "stop_id": stop_id,
+        "route": route,
+        "destination": destination,
+        "feed": os.path.basename(feed_path),
+        "start": int(service_day_start(start)),
+        # Trips of the last service day may run past its midnight
+        "end": int(service_day_start(start + timedelta(days=days))),
+        "count": len(index),
+    }
+    
+    stem = os.path.splitext(out_path)[0]
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    index.tofile(stem + INDEX_EXT + ".tmp")
+    os.replace(stem + INDEX_EXT + ".tmp", stem + INDEX_EXT)
+    with open(stem + SIDECAR_EXT + ".tmp", "w") as f:
+        json.dump(sidecar, f)
+    os.replace(stem + SIDECAR_EXT + ".tmp", stem + SIDECAR_EXT)
+    
+    return sidecar
+
+
+# === RUNTIME ===
+
+class ScheduleIndex:
+    """Read-only, memory-mapped scheduled arrivals for one stop."""
+    
+    def __init__(self, path: str):
+        """
+        Open an index built by build_index().
+        
+        Args:
+            path: Index file path (the .json sidecar must sit next to it)
+        
+        Raises:
+            OSError, ValueError: Missing or unreadable index
+        """
+        with open(os.path.splitext(path)[0] + SIDECAR_EXT) as f:
+            self.meta = json.load(f)
+        self.start = self.meta["start"]
+        self.end = self.meta["end"]
+        
+        count = os.path.getsize(path) // 4
+        if count:
+            self._times = np.memmap(path, dtype="<u4", mode="r", shape=(count,))
+        else:
+            self._times = np.zeros(0, dtype="<u4")
+    
+    def __len__(self) -> int:
+        return len(self._times)
+    
+    def covers(self, when: datetime) -> bool:
+        return self.start <= when.timestamp() < self.end
+    
+    def next_departures(self, now: datetime, count: int = 2) -> Optional[List[Dict]]:
+        """
+        Scheduled arrivals from now on, as train dicts.
+        
+        Args:
+            now: Current time (timezone-aware, e.g. cta_time.now())
+            count: Maximum number of trains
+        
+        Returns:
+            Train dicts (same keys as CTAClient's, plus "source": "schedule"),
+            or None if the index does not cover now (rebuild it)
+        """
+        if not self.covers(now):
+            return None
+        
+        i = int(np.searchsorted(self._times, int(now.timestamp())))
+        trains = []
+        for ts in self._times[i:i + count]:
+            arrival = datetime.fromtimestamp(int(ts), now.tzinfo)
+            trains.append({
+                "minutes": minutes_until(arrival, now),
+                "arrival": arrival,
+                "run": None,
+                "is_scheduled": True,
+                "is_delayed": False,
+                "source": "schedule",
+            })
+        return trains
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    
+    build = sub.add_parser("build", help="expand a GTFS feed into a stop index")
+    build.add_argument("feed", help="GTFS zip or directory")
+    build.add_argument("--stop", default="30254", help="stop ID (default: Paulina, toward the Loop)")
+    build.add_argument("--route", default="Brn")
+    build.add_argument("--destination", default="loop", help="text the trip headsign must contain")
+    build.add_argument("--days", type=int, default=60, help="service days to cover from today")
+    build.add_argument("--dir", default="schedule", help="output directory")
+    
+    nxt = sub.add_parser("next", help="print the next scheduled arrivals from an index")
+    nxt.add_argument("index")
+    nxt.add_argument("--count", type=int, default=5)
+    
+    args = ap.parse_args()
+    
+    if args.command == "build":
+        out = index_path(args.dir, args.stop, args.route, args.destination)
+        sidecar = build_index(args.feed, args.stop, args.route, args.destination, out, days=args.days)
+        print(f"{out}: {sidecar['count']} arrivals over {args.days} days ({sidecar['count'] * 4 / 1024:.0f} KiB)")
+        return
+    
+    index = ScheduleIndex(args.index)
+    trains = index.next_departures(cta_time.now(), args.count)
+    if trains is None:
+        print("Index does not cover today; rebuild it from a current feed")
+        return
+    for train in trains:
+        print(f"{train['arrival']:%Y-%m-%d %H:%M}  ({train['minutes']} min)")
+
+
+if __name__ == "__main__":
+    main()
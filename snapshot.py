@@ -0,0 +1,114 @@
+"""
+Last-known display state on disk, for painting instantly after a restart
+
+Everything here is import-light (no NumPy, Pillow or requests), because it
+runs before those are loaded: Tk reads the PPM background natively and the
+arrivals are plain JSON.
+"""
+import json
+import os
+import time
+import tkinter as tk
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from arrivals import trains_from_json, trains_to_json
+
+ARRIVALS_FILE = "arrivals.json"
+BACKGROUND_FILE = "background.ppm"
+BACKGROUND_SIDECAR = "background.json"
+
+
+class BackgroundSnapshot(NamedTuple):
+    """Background painted at startup until the real one is decoded."""
+    photo: tk.PhotoImage
+    text_color: str
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def save_arrivals(snapshot_dir: str, trains: List[Dict], saved_at: Optional[float] = None):
+    """
+    Persist the latest successful poll.
+    
+    Args:
+        snapshot_dir: Directory holding the snapshot files
+        trains: Train dicts with an "arrival" datetime
+        saved_at: Unix time of the poll (defaults to now); load_arrivals
+            reports the snapshot's age from it
+    """
+    data = {"saved_at": time.time() if saved_at is None else saved_at, "trains": trains_to_json(trains)}
+    _write_atomic(os.path.join(snapshot_dir, ARRIVALS_FILE), json.dumps(data).encode())
+
+
+def load_arrivals(snapshot_dir: str) -> Optional[Tuple[List[Dict], float]]:
+    """
+    Read the persisted poll.
+    
+    Returns:
+        Tuple of (trains, age_s), or None if there is no readable snapshot
+    """
+    try:
+        with open(os.path.join(snapshot_dir, ARRIVALS_FILE)) as f:
+            data = json.load(f)
+        trains = trains_from_json(data["trains"])
+        age_s = max(0.0, time.time() - float(data["saved_at"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if trains is None:
+        return None
+    return trains, age_s
+
+
+def save_background(snapshot_dir: str, image, text_color: str):
+    """
+    Persist the background on screen as an uncompressed PPM (worker thread).
+    
+    Args:
+        snapshot_dir: Directory holding the snapshot files
+        image: Screen-sized PIL image
+        text_color: Text color recommended for it
+    """
+    ppm_path = os.path.join(snapshot_dir, BACKGROUND_FILE)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    image.save(ppm_path + ".tmp", "PPM")
+    os.replace(ppm_path + ".tmp", ppm_path)
+    
+    sidecar = {"text_color": text_color, "width": image.width, "height": image.height}
+    _write_atomic(os.path.join(snapshot_dir, BACKGROUND_SIDECAR), json.dumps(sidecar).encode())
+
+
+def load_background(snapshot_dir: str, screen_w: int, screen_h: int) -> Optional[BackgroundSnapshot]:
+    """
+    Load the persisted background as a Tk image (call from the Tk thread).
+    
+    Returns:
+        BackgroundSnapshot, or None if there is none for this screen size
+    """
+    try:
+        with open(os.path.join(snapshot_dir, BACKGROUND_SIDECAR)) as f:
+            sidecar = json.load(f)
+        if (sidecar["width"], sidecar["height"]) != (screen_w, screen_h):
+            return None
+        photo = tk.PhotoImage(file=os.path.join(snapshot_dir, BACKGROUND_FILE), format="ppm")
+    except (OSError, ValueError, KeyError, TypeError, tk.TclError):
+        return None
+    return BackgroundSnapshot(photo, sidecar.get("text_color", "white"))
+
+
+def process_age_s() -> Optional[float]:
+    """Seconds since this process was started (Linux), including interpreter startup."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 is the start time in clock ticks after boot; the command
+            # name (field 2) may contain spaces, so split after its ")"
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime_s = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime_s - start_ticks / os.sysconf("SC_CLK_TCK")
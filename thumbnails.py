@@ -0,0 +1,157 @@
+"""
+Thumbnails of background photos, cached on disk by content hash
+
+The cache key is a hash of the image bytes, not its path: current.jpg and
+the library photo it is hard-linked to share one thumbnail, a replaced
+current.jpg gets a new one, and the hash doubles as a strong ETag that
+every backend worker computes identically. Hashes are memoized per
+(inode, mtime, size), so an unchanged file is read once per process.
+"""
+import hashlib
+import os
+import secrets
+import threading
+from typing import Dict, Hashable, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from image_utils import frame_key
+from metrics import REGISTRY
+
+THUMBNAIL_EXT = ".jpg"
+
+THUMBNAIL_TIME = REGISTRY.histogram("thumbnail_render_seconds", "Thumbnail decode, resize and encode time")
+THUMBNAILS = REGISTRY.counter("thumbnails_total", "Thumbnail lookups by cache result")
+
+
+class Thumbnail(NamedTuple):
+    """A cached thumbnail file and the ETag identifying its contents."""
+    path: str
+    etag: str
+
+
+def content_hash(path: str) -> str:
+    """Hex digest of a file's bytes (read in 1 MB chunks)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_thumbnail(source_path: str, out_path: str, size: int, quality: int = 80):
+    """
+    Write an upright JPEG thumbnail no larger than size x size.
+    
+    JPEGs are decoded with draft mode (libjpeg scales by up to 1/8 while
+    decoding), so even a 48 MP photo costs little memory and time.
+    """
+    with THUMBNAIL_TIME.time():
+        with Image.open(source_path) as src:
+            src.draft("RGB", (size, size))
+            img = ImageOps.exif_transpose(src).convert("RGB")
+        img.thumbnail((size, size), Image.LANCZOS)
+        img.save(out_path, "JPEG", quality=quality, optimize=True)
+
+
+class ThumbnailCache:
+    """
+    On-disk thumbnails, safe to share between processes.
+    
+    Files are written under a unique temporary name and renamed into
+    place, so concurrent workers rendering the same thumbnail just race
+    to an identical result. Once more than max_files exist, the oldest
+    are deleted (thumbnails of photos pruned from the library age out).
+    """
+    
+    def __init__(self, directory: str, max_files: int = 200, quality: int = 80):
+        """
+        Initialize thumbnail cache.
+        
+        Args:
+            directory: Cache directory (created if missing)
+            max_files: Thumbnails kept on disk
+            quality: JPEG quality of rendered thumbnails
+        """
+        self.directory = directory
+        self.max_files = max_files
+        self.quality = quality
+        
+        self._lock = threading.Lock()
+        # path -> (frame_key, content hash)
+        self._hashes: Dict[str, Tuple[Hashable, str]] = {}
+        os.makedirs(directory, exist_ok=True)
+    
+    def digest(self, image_path: str) -> Optional[str]:
+        """Content hash of an image, or None if it is missing."""
+        key = frame_key(image_path)
+        if key is None:
+            return None
+        with self._lock:
+            cached = self._hashes.get(image_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        try:
+            digest = content_hash(image_path)
+        except OSError:
+            return None
+        with self._lock:
+            self._hashes[image_path] = (key, digest)
+        return digest
+    
+    def get(self, image_path: str, size: int) -> Optional[Thumbnail]:
+        """
+        Thumbnail of an image, rendered on first request.
+        
+        Args:
+            image_path: Source photo
+            size: Longest edge of the thumbnail in pixels
+        
+        Returns:
+            Thumbnail, or None if the image is missing
+        
+        Raises:
+            OSError: If the image does not decode or the cache is not writable
+        """
+        digest = self.digest(image_path)
+        if digest is None:
+            return None
+        name = f"{digest}-{size}"
+        path = os.path.join(self.directory, name + THUMBNAIL_EXT)
+        if os.path.exists(path):
+            THUMBNAILS.inc(result="hit")
+            return Thumbnail(path, name)
+        
+        THUMBNAILS.inc(result="miss")
+        tmp = f"{path}.{secrets.token_hex(4)}.tmp"
+        try:
+            render_thumbnail(image_path, tmp, size, self.quality)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._prune()
+        return Thumbnail(path, name)
+    
+    def _prune(self):
+        """Delete the oldest thumbnails beyond max_files."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(THUMBNAIL_EXT)]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        
+        def mtime(entry):
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0
+        
+        entries.sort(key=mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass